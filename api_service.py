@@ -1,40 +1,305 @@
-import requests
 import os
 from dotenv import load_dotenv  
-import google.generativeai as genai
 import ast
+import threading
+from concurrent.futures import CancelledError, Future
+import tracing
+from http_client import get_client
+from response_cache import ResponseCache
+from scheduler import BACKGROUND, get_scheduler
 
 load_dotenv()
 
-BASE_URL = "https://api.themoviedb.org/3"
+BASE_URL = os.getenv("TMDB_BASE_URL", "https://api.themoviedb.org/3")
+IMAGE_BASE_URL = os.getenv("TMDB_IMAGE_BASE_URL", "https://image.tmdb.org/t/p")
 API_KEY = os.getenv("TMDB_API_KEY")
 GEMINI_KEY=os.getenv("GEMINI_KEY")
-genai.configure(api_key=GEMINI_KEY)
+
+_genai = None
+_genai_lock = threading.Lock()
+
+def load_genai():
+    """Import and configure the Gemini SDK on first use; it is slow to import."""
+    global _genai
+    with _genai_lock:
+        if _genai is None:
+            import google.generativeai as genai
+            genai.configure(api_key=GEMINI_KEY)
+            _genai = genai
+    return _genai
+
+HOUR = 60 * 60
+DAY = 24 * HOUR
+
+# endpoint -> (fresh for, then served stale while revalidating for); other endpoints are not cached.
+CACHE_TTLS = {
+    "/trending/movie/week": (6 * HOUR, 7 * DAY),
+    "/search/movie": (7 * DAY, 30 * DAY),
+}
+
+def _title_key(title):
+    return " ".join(str(title).split()).casefold()
+
+
+def _recommendation_prompt(movie_titles):
+    return (
+        f'For each movie in {movie_titles}, recommend exactly 5 similar movies. '
+        'Return only a single Python list containing all recommended movie names as strings, without any categories, headers, or extra text. '
+        'The output should be formatted exactly like this: '
+        '["Movie 1", "Movie 2", "Movie 3", "Movie 4", "Movie 5", "Movie 6", "Movie 7", "Movie 8", "Movie 9", "Movie 10"]'
+    )
+
+
+class TitleListParser:
+    """Picks complete string literals out of a Python list that arrives in pieces.
+
+    feed() takes the next chunk of text and returns the titles whose closing
+    quote it contained. Anything outside a string literal (brackets, commas,
+    a Markdown code fence) is ignored.
+    """
+
+    def __init__(self):
+        self._quote = None
+        self._escaped = False
+        self._chars = []
+
+    def feed(self, text):
+        titles = []
+        for char in text:
+            if self._quote is None:
+                if char in "\"'":
+                    self._quote = char
+                continue
+            if self._escaped:
+                self._chars.append(char)
+                self._escaped = False
+            elif char == "\\":
+                self._escaped = True
+            elif char == self._quote:
+                titles.append("".join(self._chars))
+                self._chars = []
+                self._quote = None
+            else:
+                self._chars.append(char)
+        return titles
+
 
 class MovieAPI:
+    def __init__(self, http=None, cache=None, catalog=None, scheduler=None):
+        self.http = http or get_client()
+        self.cache = cache or ResponseCache()
+        # Optional local store (MovieDatabase) that every movie we receive is upserted into.
+        self.catalog = catalog
+        self.scheduler = scheduler or get_scheduler()
+        self.cache.prune(CACHE_TTLS)
+        self._revalidating = set()
+        self._revalidating_lock = threading.Lock()
+
+    @tracing.traced("api.fetch_trending_movies")
     def fetch_trending_movies(self, page=1):
-        url = f"{BASE_URL}/trending/movie/week?api_key={API_KEY}&page={page}"
-        response = requests.get(url)
-        if response.status_code != 200:
-            print("Error fetching trending movies:", response.json())
-            return []
-        data = response.json()
+        data = self._get_json("/trending/movie/week", {"api_key": API_KEY, "page": page})
+        if data is None:
+            return None
 
         movies = data['results']
         total_pages = data['total_pages']
         return movies, total_pages
 
+    @tracing.traced("api.search_movies")
     def search_movies(self, query, page=1, per_page=20):
-        url = f"{BASE_URL}/search/movie?api_key={API_KEY}&query={query}&page={page}&per_page={per_page}"
-        response = requests.get(url)
-        return response.json().get("results", []), response.json().get("total_pages", 1)
+        """Return (movies, total_pages), or None if TMDB could not be reached."""
+        params = {"api_key": API_KEY, "query": query, "page": page, "per_page": per_page}
+        data = self._get_json("/search/movie", params)
+        if data is None:
+            return None
+        return data.get("results", []), data.get("total_pages", 1)
+
+    @tracing.traced("api.resolve_titles")
+    def resolve_titles(self, titles, priority=BACKGROUND, group=None):
+        """Look up the best TMDB match for each title, concurrently.
+
+        Titles are deduplicated case-insensitively and matches are
+        remembered across runs. Exact title matches in the local catalog
+        are used before going to the network. The remaining searches run on
+        the request scheduler at `priority`; cancelling `group` there drops
+        the ones not yet started. Returns a list aligned with `titles`
+        holding a movie dict or None.
+        """
+        keys = [_title_key(title) for title in titles]
+        unique = list(dict.fromkeys(key for key in keys if key))
+        resolved = self.cache.get_resolved_titles(unique)
+        missing = [key for key in unique if key not in resolved]
+        if missing and self.catalog is not None:
+            resolved.update(self.catalog.find_titles(missing))
+            missing = [key for key in missing if key not in resolved]
+
+        if missing:
+            futures = [self.scheduler.submit(self._lookup_title, key, priority=priority, group=group)
+                       for key in missing]
+            found = {}
+            for key, future in zip(missing, futures):
+                try:
+                    found[key] = future.result()
+                except CancelledError:
+                    found[key] = None
+            self.cache.put_resolved_titles({key: movie for key, movie in found.items() if movie})
+            resolved.update(found)
+
+        return [resolved.get(key) for key in keys]
+
+    @tracing.traced("api.fetch_movie")
+    def fetch_movie(self, movie_id):
+        """Return the TMDB movie dict for an id, or None if TMDB does not know it."""
+        movie = self._get_json(f"/movie/{movie_id}", {"api_key": API_KEY})
+        if not movie or "id" not in movie:
+            return None
+        movie = dict(movie)
+        # The details endpoint spells out genres; list endpoints (and the catalog) carry only their ids.
+        movie.setdefault("genre_ids", [genre["id"] for genre in movie.get("genres", [])])
+        return movie
+
+    @tracing.traced("api.resolve_ids")
+    def resolve_ids(self, movie_ids, priority=BACKGROUND, group=None):
+        """Look up TMDB movie dicts by id, concurrently; returns {movie_id: movie} for the ids found.
+
+        Movies already in the local catalog are not fetched again.
+        """
+        movie_ids = list(dict.fromkeys(movie_ids))
+        found = self.catalog.get_movies(movie_ids) if self.catalog is not None else {}
+        missing = [movie_id for movie_id in movie_ids if movie_id not in found]
+        futures = [self.scheduler.submit(self.fetch_movie, movie_id, priority=priority, group=group)
+                   for movie_id in missing]
+        for movie_id, future in zip(missing, futures):
+            try:
+                movie = future.result()
+            except CancelledError:
+                movie = None
+            if movie is not None:
+                found[movie_id] = movie
+        return found
+
+    def resolve_title_async(self, title, priority=BACKGROUND, group=None):
+        """Start resolving one title like resolve_titles() does; returns a Future of a movie dict or None.
+
+        Remembered and catalog matches complete the future immediately.
+        """
+        key = _title_key(title)
+        resolved = self.cache.get_resolved_titles([key]) if key else {key: None}
+        if key not in resolved and self.catalog is not None:
+            resolved.update(self.catalog.find_titles([key]))
+        if key in resolved:
+            future = Future()
+            future.set_result(resolved[key])
+            return future
+
+        def lookup():
+            movie = self._lookup_title(key)
+            if movie:
+                self.cache.put_resolved_titles({key: movie})
+            return movie
+        return self.scheduler.submit(lookup, priority=priority, group=group)
+
+    def _lookup_title(self, key):
+        result = self.search_movies(key, per_page=1)
+        return result[0][0] if result and result[0] else None
+
+    def _get_json(self, endpoint, params):
+        """GET a TMDB endpoint through the response cache.
+
+        Fresh entries are returned without touching the network. Entries past
+        their TTL but inside the stale window are returned immediately while a
+        conditional request refreshes them in the background; anything older
+        is revalidated before returning.
+        """
+        key = ResponseCache.make_key(endpoint, params)
+        ttl, stale_ttl = CACHE_TTLS.get(endpoint, (0, 0))
+        entry = self.cache.get(key)
+        if entry is not None:
+            if entry["age"] < ttl:
+                tracing.count("cache.fresh_hits")
+                return entry["data"]
+            if entry["age"] < ttl + stale_ttl:
+                tracing.count("cache.stale_hits")
+                self._revalidate_in_background(endpoint, params, key, entry)
+                return entry["data"]
+        tracing.count("cache.misses")
+        return self._revalidate(endpoint, params, key, entry)
+
+    def _revalidate(self, endpoint, params, key, entry):
+        headers = {}
+        if entry is not None:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+        tracing.count("http.requests")
+        try:
+            self.scheduler.throttle(BASE_URL)
+            with tracing.span("http.get", endpoint=endpoint):
+                response = self.http.get(f"{BASE_URL}{endpoint}", params=params, headers=headers)
+        except Exception as e:
+            print(f"Error fetching {endpoint}:", e)
+            return entry["data"] if entry else None
+
+        if response.status_code == 304 and entry is not None:
+            tracing.count("http.not_modified")
+            self.cache.touch(key)
+            return entry["data"]
+        if response.status_code != 200:
+            print(f"Error fetching {endpoint}:", response.text)
+            return entry["data"] if entry else None
+
+        data = response.json()
+        if endpoint in CACHE_TTLS:
+            self.cache.put(key, data, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        if self.catalog is not None and data.get("results"):
+            self.catalog.upsert_movies(data["results"])
+        return data
+
+    def _revalidate_in_background(self, endpoint, params, key, entry):
+        with self._revalidating_lock:
+            if key in self._revalidating:
+                return
+            self._revalidating.add(key)
+
+        def run():
+            try:
+                self._revalidate(endpoint, params, key, entry)
+            finally:
+                with self._revalidating_lock:
+                    self._revalidating.discard(key)
+
+        self.scheduler.submit(run, priority=BACKGROUND)
+
+    def fetch_image(self, url):
+        tracing.count("http.requests")
+        self.scheduler.throttle(url)
+        with tracing.span("http.image"):
+            response = self.http.get(url)
+        if response.status_code != 200:
+            return None
+        return response.content
+
+    def fetch_poster(self, poster_path, size="w200"):
+        return self.fetch_image(f"{IMAGE_BASE_URL}/{size}{poster_path}")
     
+    @tracing.traced("api.get_movie_recommendations")
     def get_movie_recommendations(self, movie_titles):
-        model = genai.GenerativeModel("gemini-pro")
-        response = model.generate_content(
-            f'For each movie in {movie_titles}, recommend exactly 5 similar movies. '
-            'Return only a single Python list containing all recommended movie names as strings, without any categories, headers, or extra text. '
-            'The output should be formatted exactly like this: '
-            '["Movie 1", "Movie 2", "Movie 3", "Movie 4", "Movie 5", "Movie 6", "Movie 7", "Movie 8", "Movie 9", "Movie 10"]'
-        )
-        return ast.literal_eval(response.text) if response else "No recommendations available."
\ No newline at end of file
+        model = load_genai().GenerativeModel("gemini-pro")
+        response = model.generate_content(_recommendation_prompt(movie_titles))
+        if not response:
+            return "No recommendations available."
+        try:
+            return ast.literal_eval(response.text)
+        except (ValueError, SyntaxError) as e:
+            print("Unreadable recommendations from the model:", e)
+            return "No recommendations available."
+
+    def stream_movie_recommendations(self, movie_titles):
+        """Like get_movie_recommendations(), but yields each title as soon as the model has finished writing it."""
+        model = load_genai().GenerativeModel("gemini-pro")
+        response = model.generate_content(_recommendation_prompt(movie_titles), stream=True)
+        parser = TitleListParser()
+        with tracing.span("api.stream_movie_recommendations"):
+            for chunk in response:
+                yield from parser.feed(chunk.text)
\ No newline at end of file
@@ -0,0 +1,238 @@
+"""Local stand-ins for TMDB and Gemini used by the benchmark suite.
+
+FakeTMDB serves /3/trending/movie/week, /3/search/movie, /3/movie/<id> and /t/p/<size>/<file>
+from a deterministic, generated catalog, with a configurable per-request
+latency and poster payload size. install_fake_genai() puts a module that
+looks like google.generativeai into sys.modules so the app's recommendation
+code runs without the real SDK or network.
+"""
+import ast
+import json
+import random
+import re
+import struct
+import sys
+import threading
+import time
+import types
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+GENRES = (28, 12, 16, 35, 80, 18, 14, 27, 9648, 10749, 878, 53)
+WORDS = (
+    "space", "heist", "family", "war", "love", "robot", "detective", "island", "storm", "king",
+    "ghost", "city", "race", "secret", "ocean", "dragon", "school", "prison", "desert", "virus",
+)
+
+
+def make_movie(movie_id):
+    """Return the TMDB-shaped movie dict for an id; the same id always gives the same movie."""
+    rng = random.Random(movie_id)
+    return {
+        "id": movie_id,
+        "title": f"Movie {movie_id}",
+        "original_title": f"Movie {movie_id}",
+        "overview": " ".join(rng.choice(WORDS) for _ in range(24)),
+        "poster_path": f"/poster{movie_id}.png",
+        "genre_ids": rng.sample(GENRES, 2),
+        "popularity": round(rng.uniform(1, 500), 3),
+        "vote_average": round(rng.uniform(3, 9), 1),
+        "vote_count": rng.randint(10, 20000),
+        "release_date": f"{rng.randint(1970, 2024)}-01-01",
+    }
+
+
+def make_png(width=200, height=300, size=15000):
+    """Build a solid-colour PNG padded with a text chunk to roughly `size` bytes."""
+    def chunk(kind, data):
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body) & 0xFFFFFFFF)
+
+    row = b"\x00" + b"\x33\x66\x99" * width
+    png = (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(row * height))
+    )
+    padding = max(0, size - len(png) - 12 - 12 - len(b"Comment\x00"))
+    return png + chunk(b"tEXt", b"Comment\x00" + b"x" * padding) + chunk(b"IEND", b"")
+
+
+class FakeTMDB:
+    """Threaded HTTP server imitating the TMDB endpoints the app uses.
+
+    latency is added to every response, in seconds. requests counts served
+    requests by kind ("trending", "search", "image"). Like the real service,
+    the API and the images are served from different hosts (here, ports),
+    so per-host rate limits apply to them separately.
+    """
+
+    def __init__(self, latency=0.05, results_per_page=20, total_pages=500, image_bytes=15000):
+        self.latency = latency
+        self.results_per_page = results_per_page
+        self.total_pages = total_pages
+        self.image = make_png(size=image_bytes)
+        self.requests = Counter()
+        self._lock = threading.Lock()
+        self._servers = [ThreadingHTTPServer(("127.0.0.1", 0), self._handler()) for _ in range(2)]
+        for server in self._servers:
+            server.daemon_threads = True
+
+    @property
+    def api_url(self):
+        return f"http://127.0.0.1:{self._servers[0].server_port}/3"
+
+    @property
+    def image_url(self):
+        return f"http://127.0.0.1:{self._servers[1].server_port}/t/p"
+
+    def start(self):
+        for server in self._servers:
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+
+    def count(self, kind):
+        with self._lock:
+            self.requests[kind] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.requests)
+
+    def trending(self, page):
+        first = (page - 1) * self.results_per_page + 1
+        return {
+            "page": page,
+            "results": [make_movie(movie_id) for movie_id in range(first, first + self.results_per_page)],
+            "total_pages": self.total_pages,
+            "total_results": self.total_pages * self.results_per_page,
+        }
+
+    def search(self, query, page, per_page):
+        per_page = per_page or self.results_per_page
+        match = re.search(r"\d+", query)
+        seed = int(match.group()) if match else zlib.crc32(query.encode())
+        first = seed + (page - 1) * per_page
+        return {
+            "page": page,
+            "results": [make_movie(movie_id) for movie_id in range(first, first + per_page)],
+            "total_pages": 5,
+            "total_results": 5 * per_page,
+        }
+
+    def movie(self, movie_id):
+        """The details endpoint lists genres as objects rather than ids."""
+        movie = make_movie(movie_id)
+        movie["genres"] = [{"id": genre, "name": str(genre)} for genre in movie.pop("genre_ids")]
+        return movie
+
+    def _handler(self):
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                time.sleep(service.latency)
+                url = urlsplit(self.path)
+                query = {key: values[0] for key, values in parse_qs(url.query).items()}
+                page = int(query.get("page", 1))
+                if url.path.startswith("/t/p/"):
+                    service.count("image")
+                    self._send(service.image, "image/png")
+                elif url.path == "/3/trending/movie/week":
+                    service.count("trending")
+                    self._send_json(service.trending(page))
+                elif url.path == "/3/search/movie":
+                    service.count("search")
+                    self._send_json(service.search(query.get("query", ""), page, int(query.get("per_page", 0))))
+                elif re.fullmatch(r"/3/movie/\d+", url.path):
+                    service.count("movie")
+                    self._send_json(service.movie(int(url.path.rsplit("/", 1)[1])))
+                else:
+                    service.count("other")
+                    self._send(b"{}", "application/json", status=404)
+
+            def _send_json(self, data):
+                self._send(json.dumps(data).encode(), "application/json")
+
+            def _send(self, body, content_type, status=200):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+class FakeGemini:
+    """Records calls and answers every prompt with five deterministic "Movie <id>" titles per movie."""
+
+    def __init__(self, latency=0.5, per_movie=5):
+        self.latency = latency
+        self.per_movie = per_movie
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def answer(self, prompt):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        return self._titles(prompt)
+
+    def answer_stream(self, prompt, chunk_size=16):
+        """Yield the answer in chunks, spreading the latency over them as a model generating tokens would."""
+        with self._lock:
+            self.calls += 1
+        text = self._titles(prompt)
+        chunks = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+        for chunk in chunks:
+            time.sleep(self.latency / len(chunks))
+            yield chunk
+
+    def _titles(self, prompt):
+        # The app's prompt starts "For each movie in [<titles>], ..."
+        match = re.search(r"in (\[.*?\])", prompt)
+        sources = ast.literal_eval(match.group(1)) if match else [prompt]
+        titles = []
+        for source in sources:
+            rng = random.Random(zlib.crc32(str(source).encode()))
+            titles += [f"Movie {rng.randint(1, 100000)}" for _ in range(self.per_movie)]
+        return json.dumps(titles)
+
+
+def install_fake_genai(gemini):
+    """Make `import google.generativeai` return a stub backed by `gemini`."""
+    genai = types.ModuleType("google.generativeai")
+    genai.configure = lambda **kwargs: None
+
+    class GenerativeModel:
+        def __init__(self, model_name, **kwargs):
+            self.model_name = model_name
+
+        def generate_content(self, prompt, stream=False, **kwargs):
+            if stream:
+                return (types.SimpleNamespace(text=chunk) for chunk in gemini.answer_stream(prompt))
+            return types.SimpleNamespace(text=gemini.answer(prompt))
+
+    genai.GenerativeModel = GenerativeModel
+    try:
+        import google
+    except ImportError:
+        google = types.ModuleType("google")
+        google.__path__ = []
+    google.generativeai = genai
+    sys.modules["google"] = google
+    sys.modules["google.generativeai"] = genai
+    return genai
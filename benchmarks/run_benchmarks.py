@@ -0,0 +1,419 @@
+"""Scripted performance scenarios for the app, run against local stand-ins.
+
+    python benchmarks/run_benchmarks.py --output results.json
+
+Every run works in a fresh temporary directory, so caches and databases
+start empty. TMDB is replaced by FakeTMDB and the Gemini SDK by a stub
+(see fake_services.py), and Qt uses the offscreen platform. The scenarios
+run in order in one process; cold_start must stay first because it times
+the app's imports. Timings are in milliseconds.
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_services import FakeGemini, FakeTMDB, install_fake_genai
+
+SCENARIOS = ("cold_start", "warm_start", "page_flips", "resize_storm", "watchlist_5k", "recommendations", "bulk_import")
+WINDOW_SIZE = (1280, 800)
+
+
+def ms(seconds):
+    return round(seconds * 1000, 2)
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    return {
+        "count": len(samples),
+        "median_ms": ms(statistics.median(samples)),
+        "p95_ms": ms(samples[min(len(samples) - 1, int(len(samples) * 0.95))]),
+        "max_ms": ms(samples[-1]),
+    }
+
+
+class Bench:
+    def __init__(self, args, tmdb, gemini):
+        self.args = args
+        self.tmdb = tmdb
+        self.gemini = gemini
+        self.app = None
+        self.gui = None
+
+    def pump(self, seconds):
+        end = time.perf_counter() + seconds
+        while time.perf_counter() < end:
+            self.app.processEvents()
+            time.sleep(0.001)
+
+    def wait_for(self, condition, timeout=None):
+        """Process events until condition() holds; return the time taken, or None on timeout."""
+        timeout = self.args.timeout if timeout is None else timeout
+        start = time.perf_counter()
+        while not condition():
+            if time.perf_counter() - start > timeout:
+                return None
+            self.app.processEvents()
+            time.sleep(0.001)
+        return time.perf_counter() - start
+
+    def requests_since(self, before):
+        after = self.tmdb.snapshot()
+        return {kind: after.get(kind, 0) - before.get(kind, 0) for kind in after if after.get(kind, 0) != before.get(kind, 0)}
+
+    def visible_movies(self, grid):
+        viewport = grid.viewport().rect()
+        model = grid.movie_model
+        return [
+            movie for row, movie in enumerate(model.movies)
+            if grid.visualRect(model.index(row)).intersects(viewport)
+        ]
+
+    def posters_ready(self, window, grid):
+        movies = self.visible_movies(grid)
+        return bool(movies) and all(
+            window.poster_loader.cached(movie["poster_path"], self.gui.POSTER_WIDTH, self.gui.POSTER_HEIGHT) is not None
+            for movie in movies if movie.get("poster_path")
+        )
+
+    def new_window(self):
+        window = self.gui.MovieApp()
+        window.resize(*WINDOW_SIZE)
+        window.show()
+        return window
+
+    def close_window(self, window):
+        window.close()
+        window.shutdown()
+        window.deleteLater()
+        self.pump(0.05)
+
+    def start_window(self):
+        """Open a window and wait for the first trending page and its visible posters."""
+        start = time.perf_counter()
+        window = self.new_window()
+        # The window reopens on the page the previous scenario left it on.
+        window.show_trending_movies()
+        constructed = time.perf_counter() - start
+        first_page = self.wait_for(lambda: window.movie_grid.movie_model.movies)
+        posters = self.wait_for(lambda: self.posters_ready(window, window.movie_grid))
+        return window, {
+            "construct_ms": ms(constructed),
+            "first_page_ms": ms(constructed + (first_page or 0)),
+            "visible_posters_ms": ms(time.perf_counter() - start) if posters is not None else None,
+        }
+
+    def cold_start(self):
+        before = self.tmdb.snapshot()
+        start = time.perf_counter()
+        from PyQt5.QtWidgets import QApplication
+        self.app = QApplication.instance() or QApplication([sys.argv[0]])
+        import gui
+        self.gui = gui
+        imported = time.perf_counter() - start
+        window, result = self.start_window()
+        self.wait_for(lambda: window.time_to_first_paint is not None)
+        first_paint = gui.STARTUP_TIME + (window.time_to_first_paint or 0) - start
+        self.close_window(window)
+        return dict(result, import_ms=ms(imported), first_paint_ms=ms(first_paint),
+                    requests=self.requests_since(before))
+
+    def warm_start(self):
+        before = self.tmdb.snapshot()
+        window, result = self.start_window()
+        self.close_window(window)
+        result = dict(result, requests=self.requests_since(before))
+
+        # Every cached response past its stale window: only the session snapshot can paint early.
+        with contextlib.closing(sqlite3.connect("api_cache.db")) as conn, conn:
+            conn.execute("UPDATE responses SET fetched_at = 0")
+        before = self.tmdb.snapshot()
+        start = time.perf_counter()
+        window, expired = self.start_window()
+        self.wait_for(lambda: window.trending_feed.pages)
+        expired["refreshed_ms"] = ms(time.perf_counter() - start)
+        expired["requests"] = self.requests_since(before)
+        result["expired_cache"] = expired
+        self.close_window(window)
+        return result
+
+    def page_flips(self):
+        window, _ = self.start_window()
+        # Paging needs the live first page; the session snapshot only paints a placeholder.
+        self.wait_for(lambda: window.trending_feed.pages)
+        window.infinite_scroll_checkbox.setChecked(False)
+        before = self.tmdb.snapshot()
+        model = window.movie_grid.movie_model
+
+        def flip(step):
+            target = window.trending_feed.current_page + step
+            start = time.perf_counter()
+            if step > 0:
+                window.load_next_trending_movies()
+            else:
+                window.load_previous_trending_movies()
+            self.wait_for(lambda: window.trending_feed.current_page == target and model.movies)
+            shown = time.perf_counter() - start
+            self.wait_for(lambda: self.posters_ready(window, window.movie_grid))
+            return shown, time.perf_counter() - start
+
+        forward = [flip(1) for _ in range(self.args.flips)]
+        backward = [flip(-1) for _ in range(self.args.flips)]
+        self.close_window(window)
+        return {
+            "forward_page": summarize([shown for shown, _ in forward]),
+            "forward_posters": summarize([posters for _, posters in forward]),
+            "back_page": summarize([shown for shown, _ in backward]),
+            "back_posters": summarize([posters for _, posters in backward]),
+            "requests": self.requests_since(before),
+        }
+
+    def resize_storm(self):
+        window, _ = self.start_window()
+        before = self.tmdb.snapshot()
+        width, height = WINDOW_SIZE
+        samples = []
+        start = time.perf_counter()
+        for step in range(self.args.resizes):
+            tick = time.perf_counter()
+            window.resize(width - 400 + (step * 37) % 800, height)
+            self.app.processEvents()
+            samples.append(time.perf_counter() - tick)
+        total = time.perf_counter() - start
+        self.pump(0.3)
+        tick = time.perf_counter()
+        window.movie_grid.viewport().repaint()
+        result = {
+            "resizes": self.args.resizes,
+            "total_ms": ms(total),
+            "per_resize": summarize(samples),
+            "settled_repaint_ms": ms(time.perf_counter() - tick),
+            "requests": self.requests_since(before),
+        }
+        self.close_window(window)
+        return result
+
+    def watchlist_5k(self):
+        from fake_services import make_movie
+        window, _ = self.start_window()
+        movies = [make_movie(movie_id) for movie_id in range(100001, 100001 + self.args.watchlist_size)]
+        start = time.perf_counter()
+        window.database.add_many("watchlist", movies)
+        inserted = time.perf_counter() - start
+        self.pump(0.05)
+
+        start = time.perf_counter()
+        window.show_watchlist_page()
+        grid = window.watchlist_grid
+        grid.viewport().repaint()
+        shown = time.perf_counter() - start
+        rows = len(grid.movie_model.movies)
+
+        start = time.perf_counter()
+        bar = grid.verticalScrollBar()
+        for step in range(1, 21):
+            bar.setValue(bar.maximum() * step // 20)
+            grid.viewport().repaint()
+        scrolled = time.perf_counter() - start
+
+        start = time.perf_counter()
+        window.database.remove_many("watchlist", [movie["id"] for movie in movies])
+        self.pump(0.05)
+        removed = time.perf_counter() - start
+        self.close_window(window)
+        return {
+            "rows": rows,
+            "insert_ms": ms(inserted),
+            "show_ms": ms(shown),
+            "scroll_20_steps_ms": ms(scrolled),
+            "remove_ms": ms(removed),
+        }
+
+    def recommendations(self):
+        from fake_services import make_movie
+        window, _ = self.start_window()
+        favorites = [make_movie(movie_id) for movie_id in range(1, self.args.favorites + 1)]
+        window.database.add_many("favorites", favorites)
+        self.pump(0.05)
+
+        def run(mode="gemini"):
+            if window.is_page_built(window.recommendations_page):
+                window.recommendations_grid.clear()
+            window.recommendation_mode = mode
+            before = self.tmdb.snapshot()
+            calls = self.gemini.calls
+            start = time.perf_counter()
+            if window.is_page_built(window.recommendations_page):
+                window.refresh_recommendations()
+            else:
+                window.show_recommendations_page()
+            grid = window.recommendations_grid
+            self.wait_for(lambda: grid.movie_model.movies)
+            shown = time.perf_counter() - start
+            self.wait_for(lambda: not window.recommendation_job.busy)
+            complete = time.perf_counter() - start
+            self.wait_for(lambda: self.posters_ready(window, grid))
+            return {
+                "first_card_ms": ms(shown),
+                "complete_ms": ms(complete),
+                "visible_posters_ms": ms(time.perf_counter() - start),
+                "movies": len(grid.movie_model.movies),
+                "gemini_calls": self.gemini.calls - calls,
+                "requests": self.requests_since(before),
+            }
+
+        result = {"favorites": self.args.favorites, "cold": run(), "cached": run()}
+        if self.gui.recommender.available():
+            result["local"] = run("local")
+        result["favorite_burst"] = self.favorite_burst(window)
+        self.close_window(window)
+        return result
+
+    def favorite_burst(self, window):
+        """Favorite five movies in quick succession while the recommendations page is open."""
+        from fake_services import make_movie
+        window.recommendation_mode = "gemini"
+        first = self.args.favorites + 1
+        movies = [make_movie(movie_id) for movie_id in range(first, first + 5)]
+        calls = self.gemini.calls
+        clicks = []
+        start = time.perf_counter()
+        for movie in movies:
+            click = time.perf_counter()
+            window.toggle_favorites(movie)
+            clicks.append(time.perf_counter() - click)
+            self.pump(0.05)
+        self.pump(0.05)
+        self.wait_for(lambda: not window.recommendation_job.busy)
+        return {
+            "max_click_ms": ms(max(clicks)),
+            "updated_ms": ms(time.perf_counter() - start),
+            "gemini_calls": self.gemini.calls - calls,
+        }
+
+    def bulk_import(self):
+        """Import a CSV of titles and a JSON of TMDB ids through the GUI, then export both lists."""
+        window, _ = self.start_window()
+        window.show_watchlist_page()
+        window.show_favorites_page()
+        first = 500000
+        titles = [f"Movie {movie_id}" for movie_id in range(first, first + self.args.import_size)]
+        ids = list(range(2 * first, 2 * first + self.args.import_size // 5))
+        with open("import.csv", "w") as f:
+            f.write("title\n" + "\n".join(titles) + "\n")
+        with open("import.json", "w") as f:
+            json.dump(ids, f)
+
+        def run(list_name, path, grid, expected):
+            before = self.tmdb.snapshot()
+            finished = []
+            window.import_finished.connect(lambda *args: finished.append(args))
+            start = time.perf_counter()
+            window.import_list_file(list_name, path)
+            self.wait_for(lambda: finished)
+            elapsed = time.perf_counter() - start
+            window.import_finished.disconnect()
+            window.import_finished.connect(window.on_import_finished)
+            _, movies, unresolved, _ = finished[0]
+            return {
+                "entries": expected,
+                "imported": len(movies),
+                "unresolved": len(unresolved),
+                "grid_rows": len(grid.movie_model.movies),
+                "import_ms": ms(elapsed),
+                "requests": self.requests_since(before),
+            }
+
+        result = {
+            "titles_csv": run("watchlist", "import.csv", window.watchlist_grid, len(titles)),
+            "ids_json": run("favorites", "import.json", window.favorites_grid, len(ids)),
+        }
+        for list_name, path in (("watchlist", "export.json"), ("favorites", "export.csv")):
+            start = time.perf_counter()
+            window.export_list_file(list_name, path)
+            result[f"export_{list_name}_ms"] = ms(time.perf_counter() - start)
+        self.close_window(window)
+        return result
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--output", help="write results JSON here instead of stdout")
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS,
+                        help="run only this scenario (repeatable); cold_start always runs first")
+    parser.add_argument("--latency-ms", type=float, default=50, help="TMDB response latency")
+    parser.add_argument("--image-bytes", type=int, default=15000, help="poster payload size")
+    parser.add_argument("--results-per-page", type=int, default=20)
+    parser.add_argument("--gemini-latency-ms", type=float, default=300)
+    parser.add_argument("--flips", type=int, default=10, help="page flips in each direction")
+    parser.add_argument("--resizes", type=int, default=100)
+    parser.add_argument("--watchlist-size", type=int, default=5000)
+    parser.add_argument("--favorites", type=int, default=20)
+    parser.add_argument("--import-size", type=int, default=1000, help="titles in the bulk import file")
+    parser.add_argument("--trace", help="also record a Chrome trace of the whole run to this file")
+    parser.add_argument("--timeout", type=float, default=30, help="seconds to wait for any one step")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    output = os.path.abspath(args.output) if args.output else None
+    scenarios = ["cold_start"] + [name for name in SCENARIOS[1:] if not args.scenario or name in args.scenario]
+
+    tmdb = FakeTMDB(latency=args.latency_ms / 1000, results_per_page=args.results_per_page,
+                    image_bytes=args.image_bytes).start()
+    gemini = FakeGemini(latency=args.gemini_latency_ms / 1000)
+    install_fake_genai(gemini)
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    os.environ["TMDB_BASE_URL"] = tmdb.api_url
+    os.environ["TMDB_IMAGE_BASE_URL"] = tmdb.image_url
+    os.environ.setdefault("TMDB_API_KEY", "benchmark")
+    os.environ.setdefault("GEMINI_KEY", "benchmark")
+    if args.trace:
+        os.environ["MOVIE_APP_TRACE"] = os.path.abspath(args.trace)
+
+    workdir = tempfile.mkdtemp(prefix="movie-app-bench-")
+    os.chdir(workdir)
+    bench = Bench(args, tmdb, gemini)
+    results = {}
+    try:
+        # The app prints progress to stdout; keep stdout for the report.
+        with contextlib.redirect_stdout(sys.stderr):
+            for name in scenarios:
+                print(f"Running {name}...")
+                results[name] = getattr(bench, name)()
+    finally:
+        tmdb.stop()
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "trace")},
+        "workdir": workdir,
+        "scenarios": results,
+    }
+    if args.trace:
+        import tracing
+        report["trace_summary"] = tracing.tracer.summary()
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
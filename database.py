@@ -1,86 +1,454 @@
+import json
 import sqlite3
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+import tracing
+
+# Lists the app knows about; any other name works too and needs no schema change.
+LISTS = ("watchlist", "favorites", "watched")
+
+MOVIE_COLUMNS = (
+    "movie_id", "title", "original_title", "overview", "poster_path", "release_date",
+    "popularity", "vote_average", "vote_count", "genre_ids", "data", "updated_at",
+)
+
+
+def _movie_row(movie, now):
+    return (
+        movie["id"], movie.get("title") or "", movie.get("original_title"), movie.get("overview"),
+        movie.get("poster_path"), movie.get("release_date"), movie.get("popularity"),
+        movie.get("vote_average"), movie.get("vote_count"), json.dumps(movie.get("genre_ids") or []),
+        json.dumps(movie), now,
+    )
+
+
+def _upsert_movies(conn, movies):
+    """Insert or update TMDB movie dicts and return them by id, merged with what was stored.
+
+    Fields a dict leaves out keep their stored values, so adding a movie
+    from a partial record never erases metadata saved earlier.
+    """
+    movies = {movie["id"]: movie for movie in movies if isinstance(movie, dict) and movie.get("id") is not None}
+    if not movies:
+        return {}
+    ids = list(movies)
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        placeholders = ", ".join("?" * len(chunk))
+        for movie_id, data in conn.execute(
+                f'SELECT movie_id, data FROM movies WHERE movie_id IN ({placeholders})', chunk):
+            movies[movie_id] = {**json.loads(data), **movies[movie_id]}
+    now = time.time()
+    conn.executemany(f'''
+        INSERT INTO movies ({", ".join(MOVIE_COLUMNS)})
+        VALUES ({", ".join("?" * len(MOVIE_COLUMNS))})
+        ON CONFLICT (movie_id) DO UPDATE SET
+            {", ".join(f"{column} = excluded.{column}" for column in MOVIE_COLUMNS[1:])}
+    ''', [_movie_row(movie, now) for movie in movies.values()])
+    return movies
+
+
+def _migrate_legacy_layout(conn):
+    """Version 1: one movies table plus list_membership, replacing watchlist/favorites/catalog."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS movies (
+            movie_id INTEGER PRIMARY KEY,
+            title TEXT NOT NULL DEFAULT '',
+            original_title TEXT,
+            overview TEXT,
+            poster_path TEXT,
+            release_date TEXT,
+            popularity REAL,
+            vote_average REAL,
+            vote_count INTEGER,
+            genre_ids TEXT,
+            data TEXT NOT NULL,
+            updated_at REAL
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS movies_title ON movies (title COLLATE NOCASE)')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS list_membership (
+            list_name TEXT NOT NULL,
+            movie_id INTEGER NOT NULL REFERENCES movies (movie_id),
+            added_at REAL NOT NULL,
+            PRIMARY KEY (list_name, movie_id)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS list_membership_added ON list_membership (list_name, added_at)')
+    conn.execute('CREATE INDEX IF NOT EXISTS list_membership_movie ON list_membership (movie_id)')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS recommendations (
+            source_movie_id INTEGER,
+            position INTEGER,
+            title TEXT,
+            PRIMARY KEY (source_movie_id, position)
+        )
+    ''')
+
+    tables = {name for name, in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    if "catalog" in tables:
+        _upsert_movies(conn, [json.loads(data) for data, in conn.execute('SELECT data FROM catalog')])
+    now = time.time()
+    for list_name in ("watchlist", "favorites"):
+        if list_name not in tables:
+            continue
+        rows = conn.execute(f'SELECT movie_id, title, poster_path FROM {list_name} ORDER BY id').fetchall()
+        _upsert_movies(conn, [
+            {"id": movie_id, "title": title, "poster_path": poster_path} for movie_id, title, poster_path in rows
+        ])
+        # Spread added_at by microseconds to keep the old insertion order.
+        conn.executemany('''
+            INSERT OR IGNORE INTO list_membership (list_name, movie_id, added_at) VALUES (?, ?, ?)
+        ''', [(list_name, movie_id, now + position / 1e6) for position, (movie_id, _, _) in enumerate(rows)])
+
+    for trigger in ("catalog_ai", "catalog_ad", "catalog_au"):
+        conn.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+    for table in ("catalog_fts", "catalog", "watchlist", "favorites"):
+        conn.execute(f'DROP TABLE IF EXISTS {table}')
+
+
+# MIGRATIONS[n] upgrades a database from PRAGMA user_version n to n + 1.
+MIGRATIONS = (_migrate_legacy_layout,)
+SCHEMA_VERSION = len(MIGRATIONS)
+
 
 class MovieDatabase:
-    def __init__(self):
-        self.db_path = "movie_app.db"
+    def __init__(self, db_path="movie_app.db"):
+        self.db_path = db_path
+        self._lock = threading.RLock()
+        self._transaction_depth = 0
+        self._members = defaultdict(set)
+        self._listeners = []
+        self._pending_changes = []
+        # One long-lived connection shared by the GUI and worker threads;
+        # every use goes through self._lock.
+        self.conn = sqlite3.connect(
+            self.db_path, check_same_thread=False, isolation_level=None, cached_statements=256
+        )
+        self.conn.execute('PRAGMA journal_mode = WAL')
+        self.conn.execute('PRAGMA synchronous = NORMAL')
+        self.conn.execute('PRAGMA foreign_keys = ON')
+        self.conn.execute('PRAGMA temp_store = MEMORY')
+        self.conn.execute('PRAGMA cache_size = -8000')
         self.create_database()
+        self._load_membership()
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    @contextmanager
+    def transaction(self):
+        """Run the enclosed statements as one transaction; nested uses join the outer one.
+
+        List changes made inside it are announced to subscribers, in one
+        batch, once the outermost transaction has committed.
+        """
+        with self._lock:
+            if self._transaction_depth == 0:
+                self.conn.execute('BEGIN')
+            self._transaction_depth += 1
+            try:
+                yield self.conn
+            except BaseException:
+                self._transaction_depth -= 1
+                if self._transaction_depth == 0:
+                    self.conn.execute('ROLLBACK')
+                    self._pending_changes = []
+                    self._load_membership()
+                raise
+            self._transaction_depth -= 1
+            changes = []
+            if self._transaction_depth == 0:
+                tracing.count("db.transactions")
+                with tracing.span("db.commit"):
+                    self.conn.execute('COMMIT')
+                changes, self._pending_changes = self._pending_changes, []
+        if changes:
+            for listener in list(self._listeners):
+                listener(changes)
+
+    def subscribe(self, listener):
+        """Call listener(changes) after each transaction that changed a list.
+
+        changes is a list of (list_name, movie_id, "added" | "removed", movie)
+        tuples in the order they were made.
+        """
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        self._listeners.remove(listener)
+
+    def _query(self, sql, params=()):
+        tracing.count("db.queries")
+        with tracing.span("db.query"), self._lock:
+            return self.conn.execute(sql, params).fetchall()
 
     def create_database(self):
-        """Create database and tables if they don't exist."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS watchlist (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                movie_id INTEGER UNIQUE,
-                title TEXT,
-                poster_path TEXT
-            )
-        ''')
+        """Bring the schema up to SCHEMA_VERSION, migrating older layouts in place."""
+        version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+        for target in range(version + 1, SCHEMA_VERSION + 1):
+            with self.transaction() as conn:
+                MIGRATIONS[target - 1](conn)
+                conn.execute(f'PRAGMA user_version = {target}')
 
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS favorites (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                movie_id INTEGER UNIQUE,
-                title TEXT,
-                poster_path TEXT
-            )
-        ''')
+        self.has_fts = True
+        try:
+            with self.transaction() as conn:
+                exists = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'movies_fts'"
+                ).fetchone()
+                conn.execute('''
+                    CREATE VIRTUAL TABLE IF NOT EXISTS movies_fts USING fts5(
+                        title, overview, content='movies', content_rowid='movie_id'
+                    )
+                ''')
+                conn.execute('''
+                    CREATE TRIGGER IF NOT EXISTS movies_ai AFTER INSERT ON movies BEGIN
+                        INSERT INTO movies_fts (rowid, title, overview)
+                        VALUES (new.movie_id, new.title, new.overview);
+                    END
+                ''')
+                conn.execute('''
+                    CREATE TRIGGER IF NOT EXISTS movies_ad AFTER DELETE ON movies BEGIN
+                        INSERT INTO movies_fts (movies_fts, rowid, title, overview)
+                        VALUES ('delete', old.movie_id, old.title, old.overview);
+                    END
+                ''')
+                conn.execute('''
+                    CREATE TRIGGER IF NOT EXISTS movies_au AFTER UPDATE ON movies BEGIN
+                        INSERT INTO movies_fts (movies_fts, rowid, title, overview)
+                        VALUES ('delete', old.movie_id, old.title, old.overview);
+                        INSERT INTO movies_fts (rowid, title, overview)
+                        VALUES (new.movie_id, new.title, new.overview);
+                    END
+                ''')
+                if not exists:
+                    # Index movies stored before the full-text table existed, e.g. by a migration.
+                    conn.execute("INSERT INTO movies_fts (movies_fts) VALUES ('rebuild')")
+        except sqlite3.OperationalError as e:
+            # SQLite builds without FTS5 fall back to LIKE matching in search_movies.
+            print("Full-text search unavailable:", e)
+            self.has_fts = False
+
+    def _load_membership(self):
+        with self._lock:
+            members = defaultdict(set)
+            for list_name, movie_id in self.conn.execute('SELECT list_name, movie_id FROM list_membership'):
+                members[list_name].add(movie_id)
+            self._members = members
 
-        conn.commit()
-        conn.close()
+    def is_in_list(self, list_name, movie_id):
+        return movie_id in self._members.get(list_name, ())
+
+    def list_members(self, list_name):
+        with self._lock:
+            return set(self._members.get(list_name, ()))
+
+    def membership(self, movie_ids):
+        """Return {movie_id: {list_name: bool}} for a page of movies without touching SQLite."""
+        with self._lock:
+            list_names = set(LISTS) | set(self._members)
+            return {
+                movie_id: {list_name: movie_id in self._members.get(list_name, ()) for list_name in list_names}
+                for movie_id in movie_ids
+            }
+
+    def _check_list(self, list_name):
+        if not isinstance(list_name, str) or not list_name:
+            raise ValueError(f"Invalid list name: {list_name!r}")
+
+    @tracing.traced("db.add_many")
+    def add_many(self, list_name, movies):
+        """Add TMDB movie dicts to a list in one transaction, storing their metadata as well."""
+        self._check_list(list_name)
+        with self.transaction() as conn:
+            movies = _upsert_movies(conn, movies)
+            members = self._members[list_name]
+            added = [movie_id for movie_id in movies if movie_id not in members]
+            now = time.time()
+            conn.executemany('''
+                INSERT OR IGNORE INTO list_membership (list_name, movie_id, added_at) VALUES (?, ?, ?)
+            ''', [(list_name, movie_id, now + position / 1e6) for position, movie_id in enumerate(added)])
+            for movie_id in added:
+                members.add(movie_id)
+                self._pending_changes.append((list_name, movie_id, "added", movies[movie_id]))
+
+    @tracing.traced("db.remove_many")
+    def remove_many(self, list_name, movie_ids):
+        self._check_list(list_name)
+        movie_ids = list(movie_ids)
+        with self.transaction() as conn:
+            conn.executemany('DELETE FROM list_membership WHERE list_name = ? AND movie_id = ?',
+                             [(list_name, movie_id) for movie_id in movie_ids])
+            if list_name == "favorites":
+                conn.executemany('DELETE FROM recommendations WHERE source_movie_id = ?',
+                                 [(movie_id,) for movie_id in movie_ids])
+            members = self._members[list_name]
+            for movie_id in movie_ids:
+                if movie_id in members:
+                    members.discard(movie_id)
+                    self._pending_changes.append((list_name, movie_id, "removed", None))
+
+    def add_to_list(self, list_name, movie):
+        self.add_many(list_name, [movie])
+
+    def remove_from_list(self, list_name, movie_id):
+        self.remove_many(list_name, [movie_id])
+
+    def fetch_list(self, list_name):
+        """Return the movie dicts on a list, oldest addition first."""
+        rows = self._query('''
+            SELECT movies.data FROM list_membership
+            JOIN movies ON movies.movie_id = list_membership.movie_id
+            WHERE list_membership.list_name = ?
+            ORDER BY list_membership.added_at
+        ''', (list_name,))
+        return [json.loads(data) for data, in rows]
+
+    def iter_list(self, list_name, batch_size=500):
+        """Yield the movie dicts on a list like fetch_list(), without loading the whole list at once.
+
+        Reads go through a separate connection, so the shared one is free for
+        other threads while the caller consumes the rows.
+        """
+        conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+        try:
+            cursor = conn.execute('''
+                SELECT movies.data FROM list_membership
+                JOIN movies ON movies.movie_id = list_membership.movie_id
+                WHERE list_membership.list_name = ?
+                ORDER BY list_membership.added_at
+            ''', (list_name,))
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for data, in rows:
+                    yield json.loads(data)
+        finally:
+            conn.close()
+
+    def _movie_dicts(self, rows):
+        return [{"id": movie_id, "title": title, "poster_path": poster_path} for movie_id, title, poster_path in rows]
 
     def add_to_watchlist(self, movie_id, title, poster_path):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT OR IGNORE INTO watchlist (movie_id, title, poster_path)
-            VALUES (?, ?, ?)
-        ''', (movie_id, title, poster_path))
-        conn.commit()
-        conn.close()
+        self.add_many("watchlist", self._movie_dicts([(movie_id, title, poster_path)]))
+
+    def add_many_to_watchlist(self, movies):
+        """Add (movie_id, title, poster_path) rows to the watchlist."""
+        self.add_many("watchlist", self._movie_dicts(movies))
 
     def remove_from_watchlist(self, movie_id):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-            DELETE FROM watchlist WHERE movie_id = ?
-        ''', (movie_id,))
-        conn.commit()
-        conn.close()
+        self.remove_many("watchlist", [movie_id])
 
     def add_to_favorites(self, movie_id, title, poster_path):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT OR IGNORE INTO favorites (movie_id, title, poster_path)
-            VALUES (?, ?, ?)
-        ''', (movie_id, title, poster_path))
-        conn.commit()
-        conn.close()
+        self.add_many("favorites", self._movie_dicts([(movie_id, title, poster_path)]))
+
+    def add_many_to_favorites(self, movies):
+        """Add (movie_id, title, poster_path) rows to favorites."""
+        self.add_many("favorites", self._movie_dicts(movies))
 
     def remove_from_favorites(self, movie_id):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-            DELETE FROM favorites WHERE movie_id = ?
-        ''', (movie_id,))
-        conn.commit()
-        conn.close()
+        self.remove_many("favorites", [movie_id])
 
     def fetch_watchlist(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM watchlist')
-        movies = cursor.fetchall()
-        conn.close()
-        return movies
+        return self.fetch_list("watchlist")
 
     def fetch_favorites(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM favorites')
-        movies = cursor.fetchall()
-        conn.close()
-        return movies
\ No newline at end of file
+        return self.fetch_list("favorites")
+
+    def get_movie(self, movie_id):
+        rows = self._query('SELECT data FROM movies WHERE movie_id = ?', (movie_id,))
+        return json.loads(rows[0][0]) if rows else None
+
+    def get_movies(self, movie_ids):
+        """Return {movie_id: movie} for the stored movies among movie_ids."""
+        movie_ids = list(movie_ids)
+        movies = {}
+        for start in range(0, len(movie_ids), 500):
+            chunk = movie_ids[start:start + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            rows = self._query(f'SELECT movie_id, data FROM movies WHERE movie_id IN ({placeholders})', chunk)
+            movies.update((movie_id, json.loads(data)) for movie_id, data in rows)
+        return movies
+
+    def movies_version(self):
+        """Return a value that changes whenever movies are added or updated."""
+        return tuple(self._query('SELECT count(*), max(updated_at) FROM movies')[0])
+
+    def fetch_movie_features(self):
+        """Return (movie_id, genre_ids, overview, popularity, vote_average, vote_count) for every stored movie."""
+        rows = self._query('''
+            SELECT movie_id, genre_ids, overview, popularity, vote_average, vote_count FROM movies
+        ''')
+        return [(row[0], json.loads(row[1] or "[]")) + tuple(row[2:]) for row in rows]
+
+    def fetch_recommendations(self, source_movie_ids):
+        """Return {source_movie_id: [titles]} for the favorites that have cached suggestions."""
+        source_movie_ids = list(source_movie_ids)
+        if not source_movie_ids:
+            return {}
+        placeholders = ", ".join("?" * len(source_movie_ids))
+        rows = self._query(f'''
+            SELECT source_movie_id, title FROM recommendations
+            WHERE source_movie_id IN ({placeholders})
+            ORDER BY source_movie_id, position
+        ''', source_movie_ids)
+        recommendations = {}
+        for source_movie_id, title in rows:
+            recommendations.setdefault(source_movie_id, []).append(title)
+        return recommendations
+
+    def save_recommendations(self, source_movie_id, titles):
+        with self.transaction() as conn:
+            conn.execute('DELETE FROM recommendations WHERE source_movie_id = ?', (source_movie_id,))
+            conn.executemany('''
+                INSERT INTO recommendations (source_movie_id, position, title)
+                VALUES (?, ?, ?)
+            ''', [(source_movie_id, position, title) for position, title in enumerate(titles)])
+
+    @tracing.traced("db.upsert_movies")
+    def upsert_movies(self, movies):
+        """Store every TMDB movie dict we see so it can be shown, searched and resolved offline."""
+        with self.transaction() as conn:
+            _upsert_movies(conn, movies)
+
+    @tracing.traced("db.search_movies")
+    def search_movies(self, query, limit=20):
+        tokens = [token.replace('"', '') for token in query.split()]
+        tokens = [token for token in tokens if token]
+        if not tokens:
+            return []
+        if self.has_fts:
+            match = " ".join(f'"{token}"*' for token in tokens)
+            rows = self._query('''
+                SELECT movies.data FROM movies_fts
+                JOIN movies ON movies.movie_id = movies_fts.rowid
+                WHERE movies_fts MATCH ?
+                ORDER BY bm25(movies_fts, 10.0, 1.0), movies.popularity DESC
+                LIMIT ?
+            ''', (match, limit))
+        else:
+            conditions = " AND ".join("title LIKE ?" for _ in tokens)
+            rows = self._query(f'''
+                SELECT data FROM movies WHERE {conditions}
+                ORDER BY popularity DESC LIMIT ?
+            ''', [f"%{token}%" for token in tokens] + [limit])
+        return [json.loads(data) for data, in rows]
+
+    def find_titles(self, titles):
+        """Return {title: movie} for titles that exactly match (case-insensitively) a stored movie."""
+        found = {}
+        for title in titles:
+            rows = self._query('''
+                SELECT data FROM movies WHERE title = ? COLLATE NOCASE
+                ORDER BY popularity DESC LIMIT 1
+            ''', (title,))
+            if rows:
+                found[title] = json.loads(rows[0][0])
+        return found
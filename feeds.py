@@ -0,0 +1,235 @@
+from PyQt5.QtCore import QObject, QPoint, QTimer, pyqtSignal
+
+from movie_grid import MovieRole, POSTER_HEIGHT, POSTER_WIDTH
+from scheduler import INTERACTIVE, PREFETCH
+
+MAX_RESIDENT_PAGES = 5
+
+
+class PagedFeed(QObject):
+    """Feeds a paginated TMDB listing (trending, search) into a MovieGridView.
+
+    Pages are fetched on a background thread. While a page is on screen the
+    next one, metadata and posters, is prefetched so that Next or scrolling
+    to the bottom appends it without waiting. In infinite mode pages are
+    appended and prepended as the user scrolls, and no more than
+    max_resident_pages stay in the model at once. Fetches run on the
+    request scheduler, prefetches at a lower priority; restarting the feed
+    drops whatever is still queued for the old source.
+    """
+
+    _page_loaded = pyqtSignal(int, int, object, int)
+    state_changed = pyqtSignal()
+
+    def __init__(self, grid, poster_loader, scheduler, max_resident_pages=MAX_RESIDENT_PAGES, parent=None):
+        super().__init__(parent)
+        self.grid = grid
+        self.model = grid.movie_model
+        self.poster_loader = poster_loader
+        self.scheduler = scheduler
+        self.max_resident_pages = max_resident_pages
+        self.infinite = True
+        self.fetch_page = None
+        self.generation = 0
+        self.total_pages = 1
+        self.pages = []
+        self._loaded = {}
+        self._inflight = set()
+        self._want = None
+        self._adjusting = False
+        self._futures = {}
+        self._placeholder = False
+        self._page_loaded.connect(self._on_page_loaded)
+        grid.verticalScrollBar().valueChanged.connect(self._on_scrolled)
+
+    @property
+    def current_page(self):
+        return self.pages[0][0] if self.pages else 1
+
+    @property
+    def last_page(self):
+        return self.pages[-1][0] if self.pages else 0
+
+    def start(self, fetch_page, page=1, placeholder=None):
+        """Replace the feed's source; fetch_page(page) must return (movies, total_pages).
+
+        fetch_page may return None or raise when the page could not be
+        fetched; the page is then requested again the next time it is needed.
+
+        placeholder, if given, is shown until the first page arrives, which
+        then replaces only the cards that differ from it.
+        """
+        self.generation += 1
+        self.fetch_page = fetch_page
+        self.total_pages = 1
+        self.pages = []
+        self._loaded.clear()
+        self._inflight.clear()
+        self._futures.clear()
+        self.scheduler.cancel_group(self)
+        self.poster_loader.cancel(self)
+        self.grid.set_movies(placeholder or [])
+        self._placeholder = bool(placeholder)
+        self._want = ("replace", page)
+        self._request(page)
+        self.state_changed.emit()
+
+    def set_infinite(self, infinite):
+        self.infinite = infinite
+        if not infinite and len(self.pages) > 1:
+            self.show_page(self.current_page)
+
+    def show_page(self, page):
+        if self.fetch_page is None or page < 1 or page > self.total_pages:
+            return
+        self._want = ("replace", page)
+        if page in self._loaded:
+            self._apply()
+        else:
+            self._request(page)
+
+    def snapshot(self):
+        """Return (page, movies) for the first page on screen, or None before one has loaded."""
+        if not self.pages:
+            return None
+        page, count = self.pages[0]
+        return page, self.model.movies[:count]
+
+    def shutdown(self):
+        self.scheduler.cancel_group(self)
+        self.poster_loader.cancel(self)
+
+    def _request(self, page, priority=INTERACTIVE):
+        if page in self._loaded:
+            return
+        if page in self._inflight:
+            # A prefetch the user is now waiting for.
+            self.scheduler.promote(self._futures[page], priority)
+            return
+        self._inflight.add(page)
+        self._futures[page] = self.scheduler.submit(
+            self._fetch, self.generation, self.fetch_page, page, priority=priority, group=self
+        )
+
+    def _fetch(self, generation, fetch_page, page):
+        result = None
+        try:
+            result = fetch_page(page)
+        except Exception as e:
+            print("Error fetching page:", e)
+        movies, total_pages = result if result is not None else (None, None)
+        self._page_loaded.emit(generation, page, movies, total_pages)
+
+    def _on_page_loaded(self, generation, page, movies, total_pages):
+        if generation != self.generation:
+            return
+        self._inflight.discard(page)
+        self._futures.pop(page, None)
+        if movies is None:
+            # Keep what we knew about the listing; a later scroll or Next asks again.
+            if self._want is not None and self._want[1] == page:
+                self._want = None
+            self.state_changed.emit()
+            return
+        self._loaded[page] = movies
+        self.total_pages = total_pages
+        if self._want is not None and self._want[1] == page:
+            self._apply()
+        elif page == self.last_page + 1:
+            self._warm_posters(movies)
+        self.state_changed.emit()
+
+    def _apply(self):
+        action, page = self._want
+        self._want = None
+        movies = self._loaded[page]
+        if action == "replace":
+            if self._placeholder:
+                self.grid.update_movies(movies)
+            else:
+                self.grid.set_movies(movies)
+            self._placeholder = False
+            self.pages = [(page, len(movies))]
+        elif action == "append":
+            self._keep_anchor(lambda: self._append(page, movies))
+        else:
+            self._keep_anchor(lambda: self._prepend(page, movies))
+        self._forget_distant_pages()
+        self._prefetch()
+        self.state_changed.emit()
+        # If the resident pages do not fill the viewport yet, no scroll event
+        # will ever come; check again once the view has laid itself out.
+        QTimer.singleShot(0, self._check_scroll)
+
+    def _check_scroll(self):
+        self._on_scrolled(self.grid.verticalScrollBar().value())
+
+    def _append(self, page, movies):
+        self.model.insert_movies(len(self.model.movies), movies)
+        self.pages.append((page, len(movies)))
+        while len(self.pages) > self.max_resident_pages:
+            _, count = self.pages.pop(0)
+            self.model.remove_rows(0, count)
+
+    def _prepend(self, page, movies):
+        self.model.insert_movies(0, movies)
+        self.pages.insert(0, (page, len(movies)))
+        while len(self.pages) > self.max_resident_pages:
+            _, count = self.pages.pop()
+            self.model.remove_rows(len(self.model.movies) - count, count)
+
+    def _keep_anchor(self, change):
+        """Apply a model change without moving the card currently at the top of the viewport."""
+        anchor = self.grid.indexAt(QPoint(self.grid.gridSize().width() // 2, 1))
+        anchor_movie = anchor.data(MovieRole) if anchor.isValid() else None
+        anchor_y = self.grid.visualRect(anchor).y() if anchor.isValid() else 0
+        self._adjusting = True
+        try:
+            change()
+            if anchor_movie is not None:
+                row = self.model.row_of(anchor_movie.get("id"))
+                if row >= 0:
+                    new_y = self.grid.visualRect(self.model.index(row)).y()
+                    bar = self.grid.verticalScrollBar()
+                    bar.setValue(bar.value() + new_y - anchor_y)
+        finally:
+            self._adjusting = False
+
+    def _forget_distant_pages(self):
+        if not self.pages:
+            return
+        keep = range(self.current_page - 1, self.last_page + 2)
+        for page in list(self._loaded):
+            if page not in keep:
+                del self._loaded[page]
+
+    def _prefetch(self):
+        next_page = self.last_page + 1
+        if next_page <= self.total_pages:
+            if next_page in self._loaded:
+                self._warm_posters(self._loaded[next_page])
+            else:
+                self._request(next_page, PREFETCH)
+
+    def _warm_posters(self, movies):
+        for movie in movies:
+            poster_path = movie.get("poster_path")
+            if poster_path:
+                self.poster_loader.request(self, poster_path, POSTER_WIDTH, POSTER_HEIGHT, lambda pixmap: None,
+                                           priority=PREFETCH)
+
+    def _on_scrolled(self, value):
+        if not self.infinite or self._adjusting or self._want is not None or not self.pages:
+            return
+        bar = self.grid.verticalScrollBar()
+        margin = self.grid.viewport().height()
+        if value >= bar.maximum() - margin and self.last_page < self.total_pages:
+            self._want = ("append", self.last_page + 1)
+        elif value <= margin and self.current_page > 1:
+            self._want = ("prepend", self.current_page - 1)
+        else:
+            return
+        if self._want[1] in self._loaded:
+            self._apply()
+        else:
+            self._request(self._want[1])
@@ -1,30 +1,66 @@
 import sys
-import requests
+import os
+import threading
+import time
+
+# Taken before Qt and the app modules are imported so the first-paint
+# measurement covers the whole cold start.
+STARTUP_TIME = time.perf_counter()
+
 from PyQt5.QtWidgets import (
-    QApplication, QWidget, QGridLayout, QLabel, QPushButton, 
-    QVBoxLayout, QScrollArea, QHBoxLayout, QLineEdit, QStackedWidget, QSpacerItem, QSizePolicy
+    QApplication, QWidget, QLabel, QPushButton, 
+    QVBoxLayout, QHBoxLayout, QLineEdit, QStackedWidget, QSpacerItem, QSizePolicy, QCheckBox, QFileDialog
 )
-from PyQt5.QtGui import QPixmap, QFont, QIcon
-from PyQt5.QtCore import Qt, QSize
-from io import BytesIO
+from PyQt5.QtGui import QPixmap, QFont, QColor
+from PyQt5.QtCore import Qt, pyqtSignal
+import tracing
 from api_service import MovieAPI
 from database import MovieDatabase
-
-IMAGE_BASE_URL = "https://image.tmdb.org/t/p/w200"
-POSTER_WIDTH = 200
-GAP_SIZE = 20
+from feeds import PagedFeed
+import list_io
+from live_search import LiveSearch
+from movie_grid import MovieGridView, POSTER_HEIGHT, POSTER_WIDTH
+from poster_cache import PosterCache
+from poster_loader import PosterLoader
+from recommendation_job import COALESCE_MS, RecommendationJob
+import recommender
+import session_snapshot
+
+DETAILS_POSTER_WIDTH = 2 * POSTER_WIDTH
+DETAILS_POSTER_HEIGHT = 2 * POSTER_HEIGHT
+# Titles an import could not find that are listed beside the buttons; the tooltip has them all.
+MAX_NOT_FOUND_SHOWN = 5
 
 class MovieApp(QWidget):
+    lists_changed = pyqtSignal(object)
+    import_finished = pyqtSignal(str, object, object, str)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Movie App")
+        self.time_to_first_paint = None
         self.showMaximized()
 
-        self.api = MovieAPI()
         self.database = MovieDatabase()
-
-        self.current_page = 1
-        self.total_pages = 1
+        # What the last session showed; each page paints its part when it is built. Parts
+        # not replaced by fresh data before exit are saved again unchanged.
+        self.snapshot = session_snapshot.load()
+        self.api = MovieAPI(catalog=self.database)
+        # Database listeners may fire on worker threads; the signal hops to the GUI thread.
+        self.database.subscribe(self.lists_changed.emit)
+        self.lists_changed.connect(self.on_lists_changed)
+        self.import_finished.connect(self.on_import_finished)
+        self.list_io_status = {}
+        self.recommendation_mode = "local" if recommender.MODE == "local" and recommender.available() else "gemini"
+        self.local_recommender = None
+        self.recommendations_from_snapshot = False
+        self.poster_cache = PosterCache()
+        self.poster_loader = PosterLoader(self.api.fetch_poster, self.poster_cache, self.api.scheduler, parent=self)
+        self.recommendation_job = RecommendationJob(self.compute_recommendations, self.api.scheduler, parent=self)
+        self.recommendation_job.finished.connect(self.show_recommendations)
+        self.recommendation_job.progress.connect(self.add_recommendations)
+        self.placeholder_pixmap = QPixmap(DETAILS_POSTER_WIDTH, DETAILS_POSTER_HEIGHT)
+        self.placeholder_pixmap.fill(QColor("#d0d0d0"))
 
         main_layout = QVBoxLayout(self)
 
@@ -47,37 +83,70 @@ class MovieApp(QWidget):
         nav_bar.addWidget(self.favorites_btn)
         nav_bar.addWidget(self.recommendations_btn)
 
+        self.infinite_scroll = True
+        self.infinite_scroll_checkbox = QCheckBox("Infinite scroll")
+        self.infinite_scroll_checkbox.setChecked(self.infinite_scroll)
+        self.infinite_scroll_checkbox.toggled.connect(self.set_infinite_scroll)
+        nav_bar.addWidget(self.infinite_scroll_checkbox)
+
         main_layout.addLayout(nav_bar)
 
         self.stacked_widget = QStackedWidget()
         main_layout.addWidget(self.stacked_widget)
 
+        # Pages are empty shells until first shown; their widgets are built
+        # and their data loaded only when the user navigates to them.
         self.trending_page = QWidget()
-        self.init_trending_page()
-        self.stacked_widget.addWidget(self.trending_page)
-
         self.search_page = QWidget()
-        self.init_search_page()
-        self.stacked_widget.addWidget(self.search_page)
-
         self.watchlist_page = QWidget()
-        self.init_watchlist_page()
-        self.stacked_widget.addWidget(self.watchlist_page)
-
         self.favorites_page = QWidget()
-        self.init_favorites_page()
-        self.stacked_widget.addWidget(self.favorites_page)
-
         self.recommendations_page = QWidget()
-        self.init_recommendations_page()
-        self.stacked_widget.addWidget(self.recommendations_page)
-
         self.movie_details_page = QWidget()
-        self.init_movie_details_page()
-        self.stacked_widget.addWidget(self.movie_details_page)
+        self.page_builders = {
+            self.trending_page: self.init_trending_page,
+            self.search_page: self.init_search_page,
+            self.watchlist_page: self.init_watchlist_page,
+            self.favorites_page: self.init_favorites_page,
+            self.recommendations_page: self.init_recommendations_page,
+            self.movie_details_page: self.init_movie_details_page,
+        }
+        for page in self.page_builders:
+            self.stacked_widget.addWidget(page)
+        self.page_names = {
+            self.trending_page: "trending",
+            self.search_page: "search",
+            self.watchlist_page: "watchlist",
+            self.favorites_page: "favorites",
+            self.recommendations_page: "recommendations",
+        }
+        self.current_page_name = "trending"
 
         self.setLayout(main_layout)
-        self.show_trending_movies()
+        self.warm_snapshot_posters()
+        pages = {name: page for page, name in self.page_names.items()}
+        self.show_page(pages.get(self.snapshot.get("page"), self.trending_page))
+        if tracing.OVERLAY:
+            self.trace_overlay = tracing.install_overlay(self)
+
+    def ensure_page(self, page):
+        builder = self.page_builders.pop(page, None)
+        if builder is not None:
+            with tracing.span("gui.build_page", page=builder.__name__):
+                builder()
+
+    def is_page_built(self, page):
+        return page not in self.page_builders
+
+    def show_page(self, page):
+        self.ensure_page(page)
+        self.stacked_widget.setCurrentWidget(page)
+        self.current_page_name = self.page_names.get(page, self.current_page_name)
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self.time_to_first_paint is None:
+            self.time_to_first_paint = time.perf_counter() - STARTUP_TIME
+            print(f"Time to first paint: {self.time_to_first_paint * 1000:.0f} ms")
 
     def init_movie_details_page(self):
         layout = QVBoxLayout(self.movie_details_page)
@@ -103,24 +172,38 @@ class MovieApp(QWidget):
         layout.addWidget(self.movie_overview_label)
 
         back_button = QPushButton("Back")
-        back_button.clicked.connect(lambda: self.stacked_widget.setCurrentWidget(self.trending_page))
+        back_button.clicked.connect(self.show_trending_movies)
         layout.addWidget(back_button)
     
     def show_movie_details(self, movie):
+        self.ensure_page(self.movie_details_page)
         self.movie_title_label.setText(movie["title"])
 
-        if movie.get("poster_path"):
-            poster_url = IMAGE_BASE_URL + movie["poster_path"]
-            response = requests.get(poster_url)
-            pixmap = QPixmap()
-            pixmap.loadFromData(BytesIO(response.content).read())
-            self.movie_poster_label.setPixmap(pixmap.scaled(POSTER_WIDTH * 2, 300, Qt.KeepAspectRatio))
+        self.poster_loader.cancel(self.movie_poster_label)
+        poster_path = movie.get("poster_path")
+        if poster_path:
+            # Show the grid thumbnail straight away, then swap in the full-size poster.
+            thumbnail = self.poster_loader.cached(poster_path, POSTER_WIDTH, POSTER_HEIGHT)
+            self.details_thumbnail_shown = thumbnail is not None
+            if thumbnail is not None:
+                self.movie_poster_label.setPixmap(thumbnail.scaled(
+                    thumbnail.size() * 2, Qt.KeepAspectRatio, Qt.FastTransformation))
+            else:
+                self.movie_poster_label.setPixmap(self.placeholder_pixmap)
+            self.load_image(poster_path, self.movie_poster_label, self.set_details_poster,
+                            DETAILS_POSTER_WIDTH, DETAILS_POSTER_HEIGHT)
         else:
             self.movie_poster_label.clear()
 
         self.movie_overview_label.setText(movie.get("overview", "No description available."))
 
-        self.stacked_widget.setCurrentWidget(self.movie_details_page)
+        self.show_page(self.movie_details_page)
+
+    def set_details_poster(self, pixmap):
+        if pixmap:
+            self.movie_poster_label.setPixmap(pixmap)
+        elif not self.details_thumbnail_shown:
+            self.movie_poster_label.clear()
 
     def init_trending_page(self):
         layout = QVBoxLayout(self.trending_page)
@@ -133,16 +216,11 @@ class MovieApp(QWidget):
         self.title_label.setFont(font)
         layout.addWidget(self.title_label)
 
-        self.scroll_area = QScrollArea()
-        self.scroll_area.setWidgetResizable(True)
-        self.scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-
-        self.scroll_widget = QWidget()
-        self.movie_grid = QGridLayout(self.scroll_widget)
-        self.movie_grid.setSpacing(GAP_SIZE)
-
-        self.scroll_area.setWidget(self.scroll_widget)
-        layout.addWidget(self.scroll_area)
+        self.movie_grid = self.create_movie_grid()
+        layout.addWidget(self.movie_grid)
+        self.trending_feed = PagedFeed(self.movie_grid, self.poster_loader, self.api.scheduler, parent=self)
+        self.trending_feed.infinite = self.infinite_scroll
+        self.trending_feed.state_changed.connect(self.update_trending_pagination)
 
         pagination_layout = QHBoxLayout()
         self.prev_button = QPushButton("Previous")
@@ -153,6 +231,8 @@ class MovieApp(QWidget):
         pagination_layout.addWidget(self.prev_button)
         pagination_layout.addWidget(self.next_button)
         layout.addLayout(pagination_layout)
+        self.prev_button.setVisible(not self.trending_feed.infinite)
+        self.next_button.setVisible(not self.trending_feed.infinite)
 
         self.load_trending_movies()
 
@@ -162,6 +242,7 @@ class MovieApp(QWidget):
         search_layout = QHBoxLayout()
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Enter movie name...")
+        self.search_input.returnPressed.connect(self.search_movie)
         self.search_button = QPushButton("Search")
         self.search_button.clicked.connect(self.search_movie)
 
@@ -169,16 +250,13 @@ class MovieApp(QWidget):
         search_layout.addWidget(self.search_button)
         layout.addLayout(search_layout)
 
-        self.search_scroll_area = QScrollArea()
-        self.search_scroll_area.setWidgetResizable(True)
-        self.search_scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff) 
-
-        self.search_scroll_widget = QWidget()
-        self.search_grid = QGridLayout(self.search_scroll_widget)
-        self.search_grid.setSpacing(GAP_SIZE)
-
-        self.search_scroll_area.setWidget(self.search_scroll_widget)
-        layout.addWidget(self.search_scroll_area)
+        self.search_grid = self.create_movie_grid()
+        layout.addWidget(self.search_grid)
+        self.search_feed = PagedFeed(self.search_grid, self.poster_loader, self.api.scheduler, parent=self)
+        self.search_feed.infinite = self.infinite_scroll
+        self.search_feed.state_changed.connect(self.update_search_pagination)
+        self.live_search = LiveSearch(self.search_input, self.search_feed, self.api.search_movies,
+                                      self.database.search_movies, parent=self)
 
         self.search_prev_button = QPushButton("Previous")
         self.search_next_button = QPushButton("Next")
@@ -187,6 +265,13 @@ class MovieApp(QWidget):
 
         search_layout.addWidget(self.search_prev_button)
         search_layout.addWidget(self.search_next_button)
+        self.search_prev_button.setVisible(not self.search_feed.infinite)
+        self.search_next_button.setVisible(not self.search_feed.infinite)
+
+        restored = self.snapshot.get("search")
+        if restored:
+            self.search_input.setText(restored["query"])
+            self.live_search.run_now(placeholder=restored["movies"])
 
     def init_watchlist_page(self):
         layout = QVBoxLayout(self.watchlist_page)
@@ -199,39 +284,15 @@ class MovieApp(QWidget):
         self.watchlist_label.setFont(font)
         layout.addWidget(self.watchlist_label)
 
-        self.watchlist_scroll_area = QScrollArea()
-        self.watchlist_scroll_area.setWidgetResizable(True)
-        self.watchlist_scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-
-        self.watchlist_scroll_widget = QWidget()
-        self.watchlist_grid = QGridLayout(self.watchlist_scroll_widget)
-        self.watchlist_grid.setSpacing(GAP_SIZE)
+        layout.addLayout(self.create_list_io_buttons("watchlist"))
 
-        self.watchlist_scroll_area.setWidget(self.watchlist_scroll_widget)
-        layout.addWidget(self.watchlist_scroll_area)
+        self.watchlist_grid = self.create_movie_grid()
+        layout.addWidget(self.watchlist_grid)
 
         self.load_watchlist_movies()
     
     def load_watchlist_movies(self):
-        for i in reversed(range(self.watchlist_grid.count())):
-            widget = self.watchlist_grid.itemAt(i).widget()
-            if widget:
-                widget.setParent(None)
-
-        watchlist_movies = self.database.fetch_watchlist()
-
-        grid_width = self.watchlist_scroll_area.viewport().width() - 40
-        columns = max(1, grid_width // (POSTER_WIDTH + GAP_SIZE))
-
-        row, col = 0, 0
-        for movie in watchlist_movies:
-            movie_id, title, poster_path = movie[1], movie[2], movie[3]
-            movie_data = {"id": movie_id, "title": title, "poster_path": poster_path}
-            self.add_movie_to_grid(self.watchlist_grid, movie_data, row, col)
-            col += 1
-            if col >= columns:
-                col = 0
-                row += 1
+        self.watchlist_grid.set_movies(self.database.fetch_list("watchlist"))
 
     def init_favorites_page(self):
         layout = QVBoxLayout(self.favorites_page)
@@ -244,39 +305,15 @@ class MovieApp(QWidget):
         self.favorites_label.setFont(font)
         layout.addWidget(self.favorites_label)
 
-        self.favorites_scroll_area = QScrollArea()
-        self.favorites_scroll_area.setWidgetResizable(True)
-        self.favorites_scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff) 
-
-        self.favorites_scroll_widget = QWidget()
-        self.favorites_grid = QGridLayout(self.favorites_scroll_widget)
-        self.favorites_grid.setSpacing(GAP_SIZE)
+        layout.addLayout(self.create_list_io_buttons("favorites"))
 
-        self.favorites_scroll_area.setWidget(self.favorites_scroll_widget)
-        layout.addWidget(self.favorites_scroll_area)
+        self.favorites_grid = self.create_movie_grid()
+        layout.addWidget(self.favorites_grid)
 
         self.load_favorites_movies()
 
     def load_favorites_movies(self):
-        for i in reversed(range(self.favorites_grid.count())):
-            widget = self.favorites_grid.itemAt(i).widget()
-            if widget:
-                widget.setParent(None)
-
-        favorites_movies = self.database.fetch_favorites()
-
-        grid_width = self.favorites_scroll_area.viewport().width() - 40
-        columns = max(1, grid_width // (POSTER_WIDTH + GAP_SIZE))
-
-        row, col = 0, 0
-        for movie in favorites_movies:
-            movie_id, title, poster_path = movie[1], movie[2], movie[3]
-            movie_data = {"id": movie_id, "title": title, "poster_path": poster_path}
-            self.add_movie_to_grid(self.favorites_grid, movie_data, row, col)
-            col += 1
-            if col >= columns:
-                col = 0
-                row += 1
+        self.favorites_grid.set_movies(self.database.fetch_list("favorites"))
 
     def init_recommendations_page(self):
         layout = QVBoxLayout(self.recommendations_page)
@@ -289,228 +326,441 @@ class MovieApp(QWidget):
         self.recommendations_label.setFont(font)
         layout.addWidget(self.recommendations_label)
 
-        self.recommendations_scroll_area = QScrollArea()
-        self.recommendations_scroll_area.setWidgetResizable(True)
-        self.recommendations_scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-
-        self.recommendations_scroll_widget = QWidget()
-        self.recommendations_grid = QGridLayout(self.recommendations_scroll_widget)
-        self.recommendations_grid.setSpacing(GAP_SIZE)
-
-        self.recommendations_scroll_area.setWidget(self.recommendations_scroll_widget)
-        layout.addWidget(self.recommendations_scroll_area)
-
+        self.local_recommendations_checkbox = QCheckBox("Recommend from local catalog (no Gemini)")
+        self.local_recommendations_checkbox.setChecked(self.recommendation_mode == "local")
+        self.local_recommendations_checkbox.setEnabled(recommender.available())
+        self.local_recommendations_checkbox.toggled.connect(self.set_local_recommendations)
+        layout.addWidget(self.local_recommendations_checkbox, alignment=Qt.AlignCenter)
+
+        self.recommendations_grid = self.create_movie_grid()
+        layout.addWidget(self.recommendations_grid)
+
+        restored = self.snapshot.get("recommendations")
+        if (restored and restored["mode"] == self.recommendation_mode
+                and restored["favorites"] == sorted(self.database.list_members("favorites"))):
+            # Shown until the refresh below has the complete, current list.
+            self.recommendations_grid.set_movies(restored["movies"])
+            self.recommendations_from_snapshot = True
         self.load_recommendations()
 
-    def load_recommendations(self):
-        for i in reversed(range(self.recommendations_grid.count())):
-            widget = self.recommendations_grid.itemAt(i).widget()
-            if widget:
-                widget.setParent(None)
+    def load_recommendations(self, delay=0):
+        """Recompute recommendations in the background; the grid is updated when they are ready."""
+        self.recommendation_job.trigger(delay)
 
-        favorite_movies = self.database.fetch_favorites()
+    def compute_recommendations(self, cancelled, group, publish):
+        """Runs on the recommendation job's thread; returns movie dicts, or None if cancelled."""
+        favorite_movies = self.database.fetch_list("favorites")
         if(len(favorite_movies) == 0):
-            return
-        movie_titles = [movie[2] for movie in favorite_movies]
-        recommendations = self.api.get_movie_recommendations(movie_titles)
-        print(recommendations)
-        for i in range(0, len(recommendations)):
-            movies, _ = self.api.search_movies(recommendations[i], per_page=1)
-            if (len(movies) == 0):
+            return []
+        favorite_ids = [movie["id"] for movie in favorite_movies]
+        if self.recommendation_mode == "local":
+            if self.local_recommender is None:
+                self.local_recommender = recommender.LocalRecommender(self.database)
+            return self.local_recommender.recommend(
+                favorite_ids, k=5 * len(favorite_ids), exclude=self.database.list_members("watched")
+            )
+        if recommender.STREAM:
+            return self.stream_recommendations(favorite_movies, cancelled, group, publish)
+        cached = self.database.fetch_recommendations(favorite_ids)
+        for movie in favorite_movies:
+            if cancelled():
+                return None
+            movie_id, title = movie["id"], movie["title"]
+            if movie_id not in cached:
+                suggestions = self.api.get_movie_recommendations([title])
+                if not isinstance(suggestions, list):
+                    continue
+                self.database.save_recommendations(movie_id, suggestions)
+                cached[movie_id] = suggestions
+        titles = [title for movie_id in favorite_ids for title in cached.get(movie_id, [])]
+        resolved = self.api.resolve_titles(titles, group=group)
+        if cancelled():
+            return None
+        recommendations = []
+        seen_ids = set()
+        for movie in resolved:
+            if movie is None or movie["id"] in seen_ids:
                 continue
-            recommendations[i] = movies[0]
-            print(movies[0])
-
-        grid_width = self.recommendations_scroll_area.viewport().width() - 40
-        columns = max(1, grid_width // (POSTER_WIDTH + GAP_SIZE))
+            seen_ids.add(movie["id"])
+            recommendations.append(movie)
+        return recommendations
+
+    def stream_recommendations(self, favorite_movies, cancelled, group, publish):
+        """Publish each recommendation as soon as its title has streamed in and resolved."""
+        favorite_ids = [movie["id"] for movie in favorite_movies]
+        cached = self.database.fetch_recommendations(favorite_ids)
+        recommendations = []
+        seen_ids = set()
+        lock = threading.Lock()
+
+        def add(movies):
+            with lock:
+                fresh = [movie for movie in movies if movie is not None and movie["id"] not in seen_ids]
+                seen_ids.update(movie["id"] for movie in fresh)
+                recommendations.extend(fresh)
+            if fresh:
+                publish(fresh)
+
+        # Counts finished callbacks rather than futures: wait() can return
+        # before a future's callbacks have run, and a late publish would land
+        # after the final result.
+        callbacks_done = threading.Semaphore(0)
+
+        def resolved(future):
+            try:
+                if not future.cancelled() and future.exception() is None:
+                    add([future.result()])
+            finally:
+                callbacks_done.release()
+
+        cached_titles = [title for movie_id in favorite_ids for title in cached.get(movie_id, [])]
+        kept_ids = set()
+        if cached_titles:
+            movies = self.api.resolve_titles(cached_titles, group=group)
+            kept_ids.update(movie["id"] for movie in movies if movie is not None)
+            add(movies)
+        futures = []
+        kept_futures = []
+        for movie in favorite_movies:
+            if movie["id"] in cached:
+                continue
+            suggestions = []
+            attempt = []
+            try:
+                for title in self.api.stream_movie_recommendations([movie["title"]]):
+                    if cancelled():
+                        return None
+                    suggestions.append(title)
+                    future = self.api.resolve_title_async(title, group=group)
+                    future.add_done_callback(resolved)
+                    futures.append(future)
+                    attempt.append(future)
+            except Exception as e:
+                # Includes the SDK's ValueError for a chunk without text; the answer is
+                # incomplete, so it is not saved and the favorite is asked again next run.
+                print(f"Error streaming recommendations for {movie['title']}:", e)
+                continue
+            kept_futures.extend(attempt)
+            self.database.save_recommendations(movie["id"], suggestions)
+        for _ in futures:
+            callbacks_done.acquire()
+        if cancelled():
+            return None
+        for future in kept_futures:
+            if not future.cancelled() and future.exception() is None and future.result() is not None:
+                kept_ids.add(future.result()["id"])
+        # Cards already published for a skipped favorite are dropped from the
+        # final result, which then matches what the batch path would show.
+        return [movie for movie in recommendations if movie["id"] in kept_ids]
+
+    def add_recommendations(self, movies, replace):
+        if self.recommendations_from_snapshot:
+            return
+        if replace:
+            self.recommendations_grid.set_movies(movies)
+        else:
+            self.recommendations_grid.append_movies(movies)
 
-        row, col = 0, 0
-        for movie in recommendations:
-            self.add_movie_to_grid(self.recommendations_grid, movie, row, col)
-            col += 1
-            if col >= columns:
-                col = 0
-                row += 1
+    def show_recommendations(self, movies):
+        self.recommendations_from_snapshot = False
+        self.recommendations_grid.update_movies(movies)
 
     def load_trending_movies(self):
-        for i in reversed(range(self.movie_grid.count())):
-            widget = self.movie_grid.itemAt(i).widget()
-            if widget:
-                widget.setParent(None)
-
-        movies, total_pages = self.api.fetch_trending_movies(self.current_page)
-        self.total_pages = total_pages
-
-        grid_width = self.scroll_area.width() - 40
-        columns = max(1, grid_width // (POSTER_WIDTH + GAP_SIZE))
-
-        row, col = 0, 0
-        for movie in movies:
-            self.add_movie_to_grid(self.movie_grid, movie, row, col)
-            col += 1
-            if col >= columns:
-                col = 0
-                row += 1
+        restored = self.snapshot.get("trending")
+        if restored:
+            self.trending_feed.start(self.api.fetch_trending_movies, restored["page"], placeholder=restored["movies"])
+        else:
+            self.trending_feed.start(self.api.fetch_trending_movies)
 
-        self.prev_button.setEnabled(self.current_page > 1)
-        self.next_button.setEnabled(self.current_page < self.total_pages)
+    def update_trending_pagination(self):
+        feed = self.trending_feed
+        self.prev_button.setEnabled(feed.current_page > 1)
+        self.next_button.setEnabled(feed.current_page < feed.total_pages)
 
     def load_previous_trending_movies(self):
-        if self.current_page > 1:
-            self.current_page -= 1
-            self.load_trending_movies()
+        self.trending_feed.show_page(self.trending_feed.current_page - 1)
 
     def load_next_trending_movies(self):
-        if self.current_page < self.total_pages:
-            self.current_page += 1
-            self.load_trending_movies()
+        self.trending_feed.show_page(self.trending_feed.current_page + 1)
 
     def search_movie(self):
-        query = self.search_input.text().strip()
-        if not query:
-            return
+        self.live_search.run_now()
 
-        self.current_page = 1
-        self.load_search_results(query)
-
-    def load_search_results(self, query):
-        for i in reversed(range(self.search_grid.count())):
-            widget = self.search_grid.itemAt(i).widget()
-            if widget:
-                widget.setParent(None)
-
-        movies, total_pages = self.api.search_movies(query, self.current_page)
-        self.total_pages = total_pages
-
-        grid_width = self.search_scroll_area.viewport().width() - 40
-        columns = max(1, grid_width // (POSTER_WIDTH + GAP_SIZE))
-
-        row, col = 0, 0
-        for movie in movies:
-            self.add_movie_to_grid(self.search_grid, movie, row, col)
-            col += 1
-            if col >= columns:
-                col = 0
-                row += 1
-
-        self.search_prev_button.setEnabled(self.current_page > 1)
-        self.search_next_button.setEnabled(self.current_page < self.total_pages)
+    def update_search_pagination(self):
+        feed = self.search_feed
+        self.search_prev_button.setEnabled(feed.current_page > 1)
+        self.search_next_button.setEnabled(feed.current_page < feed.total_pages)
 
     def load_previous_search_results(self):
-        query = self.search_input.text().strip()
-        if self.current_page > 1:
-            self.current_page -= 1
-            self.load_search_results(query)
+        self.search_feed.show_page(self.search_feed.current_page - 1)
 
     def load_next_search_results(self):
-        query = self.search_input.text().strip()
-        if self.current_page < self.total_pages:
-            self.current_page += 1
-            self.load_search_results(query)
-
-    def add_movie_to_grid(self, grid, movie, row, col):
-        title = movie.get("title", "Unknown")
-        poster_path = movie.get("poster_path")
-        movie_id = movie.get("id")
-        poster_url = f"{IMAGE_BASE_URL}{poster_path}" if poster_path else ""
-
-        item_widget = QWidget()
-        item_layout = QVBoxLayout()
-        item_layout.setAlignment(Qt.AlignCenter)
-
-        if poster_url:
-            pixmap = self.load_image(poster_url)
-            if pixmap:
-                poster_button = QPushButton()
-                poster_button.setIcon(QIcon(pixmap))
-                poster_button.setIconSize(QSize(POSTER_WIDTH, 300))
-                poster_button.setStyleSheet("border: none;")
-                poster_button.clicked.connect(lambda: self.show_movie_details(movie))
-                item_layout.addWidget(poster_button)
-
-        title_button = QPushButton(title)
-        title_button.setFont(QFont("Arial", 10, QFont.Bold))
-        title_button.setStyleSheet("border: none; color: blue; text-decoration: underline;")
-        title_button.clicked.connect(lambda: self.show_movie_details(movie))
-        item_layout.addWidget(title_button)
-
-        watchlist_button = QPushButton("Add to Watchlist")
-        if not self.is_movie_in_watchlist(movie_id):
-            watchlist_button.clicked.connect(lambda: self.add_to_watchlist(movie_id, title, poster_path))
+        self.search_feed.show_page(self.search_feed.current_page + 1)
+
+    def feeds(self):
+        feeds = []
+        if self.is_page_built(self.trending_page):
+            feeds.append(self.trending_feed)
+        if self.is_page_built(self.search_page):
+            feeds.append(self.search_feed)
+        return feeds
+
+    def set_infinite_scroll(self, enabled):
+        self.infinite_scroll = enabled
+        if self.is_page_built(self.trending_page):
+            self.trending_feed.set_infinite(enabled)
+            self.prev_button.setVisible(not enabled)
+            self.next_button.setVisible(not enabled)
+        if self.is_page_built(self.search_page):
+            self.search_feed.set_infinite(enabled)
+            self.search_prev_button.setVisible(not enabled)
+            self.search_next_button.setVisible(not enabled)
+
+    def create_movie_grid(self):
+        grid = MovieGridView(self.poster_loader, self.database.is_in_list)
+        grid.details_requested.connect(self.show_movie_details)
+        grid.watchlist_clicked.connect(self.toggle_watchlist)
+        grid.favorites_clicked.connect(self.toggle_favorites)
+        return grid
+
+    def movie_grids(self):
+        grids = [
+            (self.trending_page, "movie_grid"),
+            (self.search_page, "search_grid"),
+            (self.watchlist_page, "watchlist_grid"),
+            (self.favorites_page, "favorites_grid"),
+            (self.recommendations_page, "recommendations_grid"),
+        ]
+        return [getattr(self, name) for page, name in grids if self.is_page_built(page)]
+
+    def refresh_grid_buttons(self):
+        for grid in self.movie_grids():
+            grid.refresh()
+
+    def toggle_watchlist(self, movie):
+        if self.is_movie_in_watchlist(movie["id"]):
+            self.remove_from_watchlist(movie["id"])
         else:
-            watchlist_button.setText("Remove from Watchlist")
-            watchlist_button.clicked.connect(lambda: self.remove_from_watchlist(movie_id))
-        item_layout.addWidget(watchlist_button)
+            self.add_to_watchlist(movie)
 
-        favorites_button = QPushButton("Add to Favorites")
-        if not self.is_movie_in_favorites(movie_id):
-            favorites_button.clicked.connect(lambda: self.add_to_favorites(movie_id, title, poster_path))
+    def toggle_favorites(self, movie):
+        if self.is_movie_in_favorites(movie["id"]):
+            self.remove_from_favorites(movie["id"])
         else:
-            favorites_button.setText("Remove from Favorites")
-            favorites_button.clicked.connect(lambda: self.remove_from_favorites(movie_id))
-        item_layout.addWidget(favorites_button)
-
-        item_widget.setLayout(item_layout)
-        grid.addWidget(item_widget, row, col, Qt.AlignCenter)
+            self.add_to_favorites(movie)
 
     def is_movie_in_watchlist(self, movie_id):
-        watchlist_movies = self.database.fetch_watchlist()
-        return any(movie[1] == movie_id for movie in watchlist_movies)
+        return self.database.is_in_list("watchlist", movie_id)
 
     def is_movie_in_favorites(self, movie_id):
-        favorites_movies = self.database.fetch_favorites()
-        return any(movie[1] == movie_id for movie in favorites_movies)
+        return self.database.is_in_list("favorites", movie_id)
 
-    def add_to_watchlist(self, movie_id, title, poster_path):
-        self.database.add_to_watchlist(movie_id, title, poster_path)
-        self.load_watchlist_movies()
+    def add_to_watchlist(self, movie):
+        self.database.add_to_list("watchlist", movie)
 
     def remove_from_watchlist(self, movie_id):
-        self.database.remove_from_watchlist(movie_id)
-        self.load_watchlist_movies()
+        self.database.remove_from_list("watchlist", movie_id)
 
-    def add_to_favorites(self, movie_id, title, poster_path):
-        self.database.add_to_favorites(movie_id, title, poster_path)
-        self.load_favorites_movies()
-        self.load_recommendations()
+    def add_to_favorites(self, movie):
+        self.database.add_to_list("favorites", movie)
 
     def remove_from_favorites(self, movie_id):
-        self.database.remove_from_favorites(movie_id)
-        self.load_favorites_movies()
+        self.database.remove_from_list("favorites", movie_id)
+
+    def list_grid(self, list_name):
+        """Return the grid showing a list, or None if the list has no page or it is not built yet."""
+        pages = {
+            "watchlist": (self.watchlist_page, "watchlist_grid"),
+            "favorites": (self.favorites_page, "favorites_grid"),
+        }
+        if list_name not in pages or not self.is_page_built(pages[list_name][0]):
+            return None
+        return getattr(self, pages[list_name][1])
+
+    def on_lists_changed(self, changes):
+        """Apply one committed transaction's list changes to the grids, then repaint the buttons once."""
+        for list_name in dict.fromkeys(change[0] for change in changes):
+            grid = self.list_grid(list_name)
+            if grid is None:
+                continue
+            added = []
+            for name, movie_id, change, movie in changes:
+                if name != list_name:
+                    continue
+                if change == "added":
+                    added.append(movie)
+                else:
+                    grid.append_movies(added)
+                    added = []
+                    grid.remove_movie(movie_id)
+            grid.append_movies(added)
+        self.refresh_grid_buttons()
+
+        if (any(change[0] == "favorites" for change in changes)
+                and self.is_page_built(self.recommendations_page)):
+            # Quick successive favorite changes are coalesced into one run by the job.
+            self.load_recommendations(delay=COALESCE_MS)
+
+    def refresh_recommendations(self):
+        self.load_recommendations()
 
-    def load_image(self, url):
+    def create_list_io_buttons(self, list_name):
+        buttons = QHBoxLayout()
+        # Shows how the last import or export of this list went.
+        status = QLabel()
+        status.setWordWrap(True)
+        self.list_io_status[list_name] = status
+        buttons.addWidget(status, 1)
+        import_button = QPushButton("Import...")
+        export_button = QPushButton("Export...")
+        import_button.clicked.connect(lambda: self.import_list_file(list_name))
+        export_button.clicked.connect(lambda: self.export_list_file(list_name))
+        buttons.addWidget(import_button)
+        buttons.addWidget(export_button)
+        return buttons
+
+    def import_list_file(self, list_name, path=None):
+        """Import titles or TMDB ids from a CSV or JSON file into a list, in the background."""
+        if path is None:
+            path, _ = QFileDialog.getOpenFileName(self, f"Import into {list_name}", "", "Movie lists (*.csv *.json)")
+            if not path:
+                return
+        self.show_list_io_status(list_name, f"Importing {os.path.basename(path)}...")
+
+        def run():
+            movies, unresolved, error = [], [], ""
+            try:
+                movies, unresolved = list_io.import_list(self.api, self.database, list_name, path)
+            except Exception as e:
+                error = f"Error importing list: {e}"
+            self.import_finished.emit(list_name, movies, unresolved, error)
+
+        # Not a scheduler job: the import waits on the lookups it schedules.
+        threading.Thread(target=run, name="list-import", daemon=True).start()
+
+    def on_import_finished(self, list_name, movies, unresolved, error):
+        if error:
+            self.show_list_io_status(list_name, error, error=True)
+            return
+        message = f"Imported {len(movies)} movies into {list_name}."
+        details = ""
+        if unresolved:
+            shown = ", ".join(str(entry) for entry in unresolved[:MAX_NOT_FOUND_SHOWN])
+            more = len(unresolved) - MAX_NOT_FOUND_SHOWN
+            message += f" Not found: {shown}" + (f" and {more} more" if more > 0 else "")
+            details = "Not found:\n" + "\n".join(str(entry) for entry in unresolved)
+        self.show_list_io_status(list_name, message, details=details)
+
+    def export_list_file(self, list_name, path=None):
+        if path is None:
+            path, _ = QFileDialog.getSaveFileName(self, f"Export {list_name}", f"{list_name}.csv",
+                                                  "CSV (*.csv);;JSON (*.json)")
+            if not path:
+                return
         try:
-            response = requests.get(url)
-            if response.status_code == 200:
-                image = QPixmap()
-                image.loadFromData(BytesIO(response.content).read())
-                return image
-        except Exception as e:
-            print("Error loading image:", e)
-        return None
+            count = list_io.export_list(self.database, list_name, path)
+        except (OSError, ValueError) as e:
+            self.show_list_io_status(list_name, f"Error exporting list: {e}", error=True)
+            return
+        self.show_list_io_status(list_name, f"Exported {count} movies from {list_name} to {path}.")
+
+    def show_list_io_status(self, list_name, message, details="", error=False):
+        status = self.list_io_status.get(list_name)
+        if status is None:
+            return
+        status.setText(message)
+        status.setToolTip(details)
+        status.setStyleSheet("color: #c0392b;" if error else "")
+
+    def set_local_recommendations(self, enabled):
+        self.recommendation_mode = "local" if enabled else "gemini"
+        self.recommendations_from_snapshot = False
+        self.refresh_recommendations()
+
+    def warm_snapshot_posters(self):
+        """Start decoding the posters the last session had on screen, before any page asks for them."""
+        for poster_path in self.snapshot.get("thumbnails", []):
+            self.poster_loader.request(self, poster_path, POSTER_WIDTH, POSTER_HEIGHT, lambda pixmap: None)
+
+    def save_session(self):
+        """Write what is on screen to the session snapshot for the next start to paint from."""
+        snapshot = {key: self.snapshot[key] for key in ("trending", "search", "recommendations") if key in self.snapshot}
+        snapshot["page"] = self.current_page_name
+        grids = {}
+        if self.is_page_built(self.trending_page):
+            grids["trending"] = self.movie_grid
+            state = self.trending_feed.snapshot()
+            if state:
+                snapshot["trending"] = {"page": state[0], "movies": state[1]}
+        if self.is_page_built(self.search_page):
+            grids["search"] = self.search_grid
+            state = self.search_feed.snapshot()
+            query = self.search_input.text().strip()
+            if not query:
+                snapshot.pop("search", None)
+            elif state:
+                snapshot["search"] = {"query": query, "movies": state[1]}
+        if self.is_page_built(self.recommendations_page):
+            grids["recommendations"] = self.recommendations_grid
+            snapshot["recommendations"] = {
+                "mode": self.recommendation_mode,
+                "favorites": sorted(self.database.list_members("favorites")),
+                "movies": self.recommendations_grid.movie_model.movies,
+            }
+        for name in ("watchlist", "favorites"):
+            grid = self.list_grid(name)
+            if grid is not None:
+                grids[name] = grid
+
+        grid = grids.get(self.current_page_name)
+        previous = set(self.snapshot.get("thumbnails", []))
+        thumbnails = []
+        for movie in grid.movie_model.movies if grid is not None else []:
+            poster_path = movie.get("poster_path")
+            if poster_path and (poster_path in previous
+                                or self.poster_loader.cached(poster_path, POSTER_WIDTH, POSTER_HEIGHT) is not None):
+                thumbnails.append(poster_path)
+                if len(thumbnails) == session_snapshot.MAX_THUMBNAILS:
+                    break
+        snapshot["thumbnails"] = thumbnails
+        session_snapshot.save(snapshot)
+
+    def load_image(self, poster_path, group, callback, width=POSTER_WIDTH, height=POSTER_HEIGHT):
+        """Fetch a poster scaled to width x height through the cache; callback receives a QPixmap or None."""
+        self.poster_loader.request(group, poster_path, width, height, callback)
 
     def show_trending_movies(self):
-        self.stacked_widget.setCurrentWidget(self.trending_page)
+        self.show_page(self.trending_page)
 
     def show_search_page(self):
-        self.stacked_widget.setCurrentWidget(self.search_page)
+        self.show_page(self.search_page)
 
     def show_watchlist_page(self):
-        self.stacked_widget.setCurrentWidget(self.watchlist_page)
+        self.show_page(self.watchlist_page)
 
     def show_favorites_page(self):
-        self.stacked_widget.setCurrentWidget(self.favorites_page)
+        self.show_page(self.favorites_page)
 
     def show_recommendations_page(self):
-        self.stacked_widget.setCurrentWidget(self.recommendations_page)
-
-    def resizeEvent(self, event):   
-        if hasattr(self, "movie_grid"):
-            self.load_trending_movies()
-        super().resizeEvent(event)
+        self.show_page(self.recommendations_page)
+
+    def shutdown(self):
+        self.save_session()
+        self.recommendation_job.cancel()
+        self.poster_loader.shutdown()
+        for feed in self.feeds():
+            feed.shutdown()
+        # Fetches still running must not write into the closed catalog.
+        self.api.catalog = None
+        self.database.close()
+        print("HTTP connection stats:", self.api.http.stats())
+        print("Poster cache stats:", self.poster_cache.stats())
+        print("Request scheduler stats:", self.api.scheduler.stats())
+        tracing.export()
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     window = MovieApp()
     window.show()
+    app.aboutToQuit.connect(window.shutdown)
     sys.exit(app.exec_())
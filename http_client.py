@@ -0,0 +1,120 @@
+import os
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 5))
+READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", 15))
+POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", 16))
+MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", 3))
+BACKOFF_FACTOR = float(os.getenv("HTTP_BACKOFF_FACTOR", 0.5))
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def _host_port(url):
+    """Return "host:port" for a URL, with the scheme's default port filled in."""
+    parts = urlsplit(url)
+    return f"{parts.hostname}:{parts.port or DEFAULT_PORTS.get(parts.scheme)}"
+
+
+class _CountingAdapter(HTTPAdapter):
+    """HTTPAdapter whose pools report every new socket connection, as "host:port", to a callback."""
+
+    def __init__(self, on_connect, **kwargs):
+        self._on_connect = on_connect
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        on_connect = self._on_connect
+
+        class CountingHTTPConnection(HTTPConnection):
+            def connect(self):
+                super().connect()
+                on_connect(f"{self.host}:{self.port}")
+
+        class CountingHTTPSConnection(HTTPSConnection):
+            def connect(self):
+                super().connect()
+                on_connect(f"{self.host}:{self.port}")
+
+        class CountingHTTPPool(HTTPConnectionPool):
+            ConnectionCls = CountingHTTPConnection
+
+        class CountingHTTPSPool(HTTPSConnectionPool):
+            ConnectionCls = CountingHTTPSConnection
+
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": CountingHTTPPool,
+            "https": CountingHTTPSPool,
+        }
+
+
+class HttpClient:
+    """Shared keep-alive transport used for every TMDB API and image request."""
+
+    def __init__(self, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT,
+                 pool_maxsize=POOL_MAXSIZE, max_retries=MAX_RETRIES, backoff_factor=BACKOFF_FACTOR):
+        self.timeout = (connect_timeout, read_timeout)
+        self.session = requests.Session()
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(["GET", "HEAD"]),
+            respect_retry_after_header=True,
+        )
+        self.adapter = _CountingAdapter(self._record_connect, pool_connections=4,
+                                        pool_maxsize=pool_maxsize, max_retries=retry)
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+        self._lock = threading.Lock()
+        self._requests = {}
+        self._connections = {}
+
+    def _record_connect(self, host):
+        with self._lock:
+            self._connections[host] = self._connections.get(host, 0) + 1
+
+    def get(self, url, params=None, headers=None, timeout=None, stream=False):
+        host = _host_port(url)
+        with self._lock:
+            self._requests[host] = self._requests.get(host, 0) + 1
+        return self.session.get(url, params=params, headers=headers,
+                                timeout=timeout or self.timeout, stream=stream)
+
+    def stats(self):
+        """Request and connection counters per "host:port"; reused = requests - connections."""
+        stats = {}
+        with self._lock:
+            requests_by_host = dict(self._requests)
+            connections = dict(self._connections)
+        for host, count in requests_by_host.items():
+            opened = connections.get(host, 0)
+            stats[host] = {
+                "requests": count,
+                "connections": opened,
+                "reused": max(0, count - opened),
+            }
+        return stats
+
+    def close(self):
+        self.session.close()
+
+
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def get_client():
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = HttpClient()
+        return _default_client
@@ -0,0 +1,173 @@
+"""Bulk import and export of movie lists.
+
+    python list_io.py import watchlist titles.csv
+    python list_io.py export favorites favorites.json
+
+Imports accept CSV or JSON. A CSV file either has a header naming an "id"
+(or "tmdb_id") and/or a "title" column, or no header and one title per row.
+A JSON file holds a list of titles, TMDB ids or movie objects with an "id" or
+"title", optionally wrapped in {"movies": [...]}. Exports write the same
+formats and can be imported again.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+
+from scheduler import BACKGROUND
+
+FORMATS = ("csv", "json")
+ID_COLUMNS = ("id", "tmdb_id")
+TITLE_COLUMNS = ("title", "name")
+EXPORT_COLUMNS = ("id", "title", "release_date", "poster_path")
+
+
+def detect_format(path, fmt=None):
+    fmt = fmt or os.path.splitext(path)[1].lstrip(".").lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown list format {fmt!r}; use one of {', '.join(FORMATS)}")
+    return fmt
+
+
+def read_entries(path, fmt=None):
+    """Return the entries of an import file: ints are TMDB ids, strings are titles."""
+    fmt = detect_format(path, fmt)
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        if fmt == "json":
+            return _json_entries(json.load(f))
+        return _csv_entries(csv.reader(f))
+
+
+def _entry(id_value, title):
+    id_value = str(id_value if id_value is not None else "").strip()
+    if id_value.isdigit():
+        return int(id_value)
+    title = " ".join(str(title if title is not None else "").split())
+    return title or None
+
+
+def _json_entries(data):
+    if isinstance(data, dict):
+        data = data.get("movies", [])
+    if not isinstance(data, list):
+        raise ValueError("Expected a JSON list of titles, ids or movies")
+    entries = []
+    for item in data:
+        if isinstance(item, dict):
+            entry = _entry(item.get("id", item.get("tmdb_id")), item.get("title", item.get("name")))
+        elif isinstance(item, bool):
+            entry = None
+        elif isinstance(item, int):
+            entry = item
+        else:
+            entry = _entry(None, item)
+        if entry is not None:
+            entries.append(entry)
+    return entries
+
+
+def _csv_entries(reader):
+    rows = [row for row in reader if any(cell.strip() for cell in row)]
+    if not rows:
+        return []
+    header = [cell.strip().lower() for cell in rows[0]]
+    id_column = next((header.index(name) for name in ID_COLUMNS if name in header), None)
+    title_column = next((header.index(name) for name in TITLE_COLUMNS if name in header), None)
+    if id_column is None and title_column is None:
+        # No header: every row is a title (a title may well be a number, like "1917").
+        title_column = 0
+    else:
+        rows = rows[1:]
+
+    def cell(row, column):
+        return row[column] if column is not None and column < len(row) else None
+
+    entries = [_entry(cell(row, id_column), cell(row, title_column)) for row in rows]
+    return [entry for entry in entries if entry is not None]
+
+
+def import_list(api, database, list_name, path, fmt=None, priority=BACKGROUND, group=None):
+    """Resolve every entry of an import file and add the movies to a list in one transaction.
+
+    Ids and titles are resolved concurrently through the request scheduler,
+    so this blocks and must not run on a scheduler worker. Returns
+    (movies, unresolved), where unresolved holds the entries nothing was
+    found for.
+    """
+    entries = read_entries(path, fmt)
+    ids = [entry for entry in entries if isinstance(entry, int)]
+    titles = [entry for entry in entries if isinstance(entry, str)]
+    by_id = api.resolve_ids(ids, priority=priority, group=group) if ids else {}
+    by_title = dict(zip(titles, api.resolve_titles(titles, priority=priority, group=group))) if titles else {}
+
+    movies = {}
+    unresolved = []
+    for entry in entries:
+        movie = by_id.get(entry) if isinstance(entry, int) else by_title.get(entry)
+        if movie is None:
+            unresolved.append(entry)
+        else:
+            movies.setdefault(movie["id"], movie)
+    movies = list(movies.values())
+    database.add_many(list_name, movies)
+    return movies, unresolved
+
+
+def export_list(database, list_name, path, fmt=None):
+    """Write a list to a CSV or JSON file, streaming it from the database; returns the number of movies."""
+    fmt = detect_format(path, fmt)
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            writer = csv.DictWriter(f, fieldnames=EXPORT_COLUMNS, extrasaction="ignore")
+            writer.writeheader()
+            for movie in database.iter_list(list_name):
+                writer.writerow(movie)
+                count += 1
+        else:
+            f.write("[")
+            for movie in database.iter_list(list_name):
+                f.write(",\n " if count else "\n ")
+                f.write(json.dumps(movie))
+                count += 1
+            f.write("\n]\n" if count else "]\n")
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--db", default="movie_app.db", help="database file")
+    parser.add_argument("--format", choices=FORMATS, help="file format; taken from the extension by default")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for command in ("import", "export"):
+        sub = commands.add_parser(command)
+        sub.add_argument("list_name", help="watchlist, favorites or any other list")
+        sub.add_argument("path")
+    args = parser.parse_args(argv)
+
+    from database import MovieDatabase
+    database = MovieDatabase(args.db)
+    try:
+        if args.command == "export":
+            count = export_list(database, args.list_name, args.path, args.format)
+            print(f"Exported {count} movies from {args.list_name} to {args.path}")
+        else:
+            from api_service import MovieAPI
+            api = MovieAPI(catalog=database)
+            movies, unresolved = import_list(api, database, args.list_name, args.path, args.format)
+            print(f"Imported {len(movies)} movies into {args.list_name}")
+            for entry in unresolved:
+                print("Not found:", entry)
+            api.scheduler.shutdown()
+            api.catalog = None
+    except (OSError, ValueError) as e:
+        print("Error:", e)
+        return 1
+    finally:
+        database.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+import re
+import threading
+from collections import OrderedDict
+
+from PyQt5.QtCore import QObject, QTimer
+
+SEARCH_DELAY_MS = 300
+MIN_QUERY_LENGTH = 2
+MAX_REMEMBERED_QUERIES = 64
+_PUNCTUATION = re.compile(r"[^\w\s]+")
+
+
+def _normalize(text):
+    return " ".join(_PUNCTUATION.sub(" ", text.casefold()).split())
+
+
+class LiveSearch(QObject):
+    """Search-as-you-type for the search page.
+
+    Keystrokes are debounced before a query is sent. Every query restarts the
+    PagedFeed, whose generation counter drops responses for superseded
+    queries, so results never land out of order. When a shorter prefix of
+    the query already returned its complete result set (a single page), the
+    refinement is answered by filtering that set locally instead of asking
+    TMDB again. Otherwise matches from the local catalog are shown at once
+    and merged behind the remote results for the first page.
+    """
+
+    def __init__(self, line_edit, feed, search, local_search=None, delay_ms=SEARCH_DELAY_MS, parent=None):
+        super().__init__(parent)
+        self.line_edit = line_edit
+        self.feed = feed
+        self.search = search
+        self.local_search = local_search
+        self.query = None
+        self._complete = OrderedDict()
+        self._lock = threading.Lock()
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay_ms)
+        self._timer.timeout.connect(self.run)
+        line_edit.textChanged.connect(self._timer.start)
+
+    def run_now(self, placeholder=None):
+        self._timer.stop()
+        self.run(force=True, placeholder=placeholder)
+
+    def run(self, force=False, placeholder=None):
+        query = " ".join(self.line_edit.text().split())
+        key = query.casefold()
+        if key == self.query and not force:
+            return
+        self.query = key
+
+        if len(key) < MIN_QUERY_LENGTH:
+            self.feed.start(lambda page: ([], 1))
+            return
+
+        movies = self._from_prefix(key)
+        if movies is not None:
+            self.feed.start(lambda page: (movies, 1))
+            return
+
+        local = self.local_search(query) if self.local_search else []
+        self.feed.start(lambda page: self._fetch(query, key, page, local), placeholder=placeholder or local)
+
+    def _fetch(self, query, key, page, local):
+        result = self.search(query, page)
+        if result is None:
+            # Not remembered, so the same query or a refinement asks TMDB again.
+            return None
+        movies, total_pages = result
+        if page == 1:
+            remote_ids = {movie.get("id") for movie in movies}
+            movies = movies + [movie for movie in local if movie.get("id") not in remote_ids]
+        if page == 1 and total_pages <= 1:
+            with self._lock:
+                self._complete[key] = movies
+                while len(self._complete) > MAX_REMEMBERED_QUERIES:
+                    self._complete.popitem(last=False)
+        return movies, total_pages
+
+    def _from_prefix(self, key):
+        with self._lock:
+            for length in range(len(key), MIN_QUERY_LENGTH - 1, -1):
+                movies = self._complete.get(key[:length])
+                if movies is not None:
+                    self._complete.move_to_end(key[:length])
+                    break
+            else:
+                return None
+        # TMDB matches words, not the query as one substring, so every word
+        # has to turn up somewhere in the title.
+        tokens = _normalize(key).split()
+        return [
+            movie for movie in movies
+            if any(all(token in title for token in tokens)
+                   for title in (_normalize(movie.get("title") or ""), _normalize(movie.get("original_title") or "")))
+        ]
@@ -0,0 +1,294 @@
+from PyQt5.QtWidgets import QListView, QStyledItemDelegate, QStyle, QStyleOptionButton, QApplication
+from PyQt5.QtGui import QColor, QFont, QPen
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QRect, QSize, QEvent, QTimer, pyqtSignal
+
+import tracing
+
+POSTER_WIDTH = 200
+POSTER_HEIGHT = 300
+GAP_SIZE = 20
+REFLOW_DELAY_MS = 120
+TITLE_HEIGHT = 24
+BUTTON_HEIGHT = 28
+CARD_PADDING = 6
+CARD_WIDTH = POSTER_WIDTH + 2 * CARD_PADDING
+CARD_HEIGHT = POSTER_HEIGHT + TITLE_HEIGHT + 2 * BUTTON_HEIGHT + 5 * CARD_PADDING
+
+MovieRole = Qt.UserRole + 1
+WatchlistRole = Qt.UserRole + 2
+FavoritesRole = Qt.UserRole + 3
+
+
+class MovieListModel(QAbstractListModel):
+    """List of TMDB movie dicts shown by a MovieGridView.
+
+    Posters are only requested when the view asks for a row's decoration,
+    which it does for visible cards only, and are kept in the shared
+    poster cache rather than in the model.
+    """
+
+    def __init__(self, poster_loader, is_in_list, parent=None):
+        super().__init__(parent)
+        self.poster_loader = poster_loader
+        self.is_in_list = is_in_list
+        self.movies = []
+        self._requested = set()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.movies)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        movie = self.movies[index.row()]
+        if role == Qt.DisplayRole:
+            return movie.get("title", "Unknown")
+        if role == Qt.DecorationRole:
+            return self._poster(movie)
+        if role == MovieRole:
+            return movie
+        if role == WatchlistRole:
+            return self.is_in_list("watchlist", movie.get("id"))
+        if role == FavoritesRole:
+            return self.is_in_list("favorites", movie.get("id"))
+        return None
+
+    def _poster(self, movie):
+        poster_path = movie.get("poster_path")
+        if not poster_path:
+            return None
+        pixmap = self.poster_loader.cached(poster_path, POSTER_WIDTH, POSTER_HEIGHT)
+        if pixmap is None and poster_path not in self._requested:
+            self._requested.add(poster_path)
+            self.poster_loader.request(
+                self, poster_path, POSTER_WIDTH, POSTER_HEIGHT,
+                lambda pixmap: self._poster_loaded(poster_path, pixmap),
+                check_cache=False,
+            )
+        return pixmap
+
+    def _poster_loaded(self, poster_path, pixmap):
+        self._requested.discard(poster_path)
+        if pixmap is not None and self.movies:
+            # A multi-row dataChanged only schedules a viewport repaint, so this
+            # stays cheap however many rows the model holds.
+            self.dataChanged.emit(self.index(0), self.index(len(self.movies) - 1), [Qt.DecorationRole])
+
+    @tracing.traced("grid.set_movies")
+    def set_movies(self, movies):
+        self.beginResetModel()
+        self.poster_loader.cancel(self)
+        self._requested.clear()
+        self.movies = list(movies)
+        self.endResetModel()
+
+    def clear(self):
+        self.set_movies([])
+
+    @tracing.traced("grid.update_movies")
+    def update_movies(self, movies):
+        """Replace the list in place, repainting only the cards whose title or poster changed."""
+        movies = list(movies)
+        common = min(len(self.movies), len(movies))
+        changed = [
+            row for row in range(common)
+            if any(self.movies[row].get(field) != movies[row].get(field) for field in ("id", "title", "poster_path"))
+        ]
+        self.movies[:common] = movies[:common]
+        for row in changed:
+            self.dataChanged.emit(self.index(row), self.index(row))
+        if len(movies) > common:
+            self.insert_movies(common, movies[common:])
+        else:
+            self.remove_rows(common, len(self.movies) - common)
+
+    def row_of(self, movie_id):
+        for row, movie in enumerate(self.movies):
+            if movie.get("id") == movie_id:
+                return row
+        return -1
+
+    def append_movie(self, movie):
+        self.insert_movies(len(self.movies), [movie])
+
+    @tracing.traced("grid.insert_movies")
+    def insert_movies(self, row, movies):
+        movies = list(movies)
+        if not movies:
+            return
+        self.beginInsertRows(QModelIndex(), row, row + len(movies) - 1)
+        self.movies[row:row] = movies
+        self.endInsertRows()
+
+    def remove_rows(self, row, count):
+        if count <= 0:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row + count - 1)
+        del self.movies[row:row + count]
+        self.endRemoveRows()
+
+    def remove_movie(self, movie_id):
+        row = self.row_of(movie_id)
+        if row < 0:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.movies[row]
+        self.endRemoveRows()
+
+    def refresh(self):
+        if self.movies:
+            self.dataChanged.emit(self.index(0), self.index(len(self.movies) - 1),
+                                  [WatchlistRole, FavoritesRole])
+
+
+class MovieCardDelegate(QStyledItemDelegate):
+    """Paints a poster card with its title and list buttons, without any child widgets."""
+
+    details_requested = pyqtSignal(object)
+    watchlist_clicked = pyqtSignal(object)
+    favorites_clicked = pyqtSignal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.title_font = QFont("Arial", 10, QFont.Bold)
+        self.title_font.setUnderline(True)
+
+    def sizeHint(self, option, index):
+        return QSize(CARD_WIDTH, CARD_HEIGHT)
+
+    def _rects(self, rect):
+        left = rect.x() + CARD_PADDING
+        width = rect.width() - 2 * CARD_PADDING
+        poster = QRect(left, rect.y() + CARD_PADDING, width, POSTER_HEIGHT)
+        title = QRect(left, poster.bottom() + 1 + CARD_PADDING, width, TITLE_HEIGHT)
+        watchlist = QRect(left, title.bottom() + 1 + CARD_PADDING, width, BUTTON_HEIGHT)
+        favorites = QRect(left, watchlist.bottom() + 1 + CARD_PADDING, width, BUTTON_HEIGHT)
+        return poster, title, watchlist, favorites
+
+    @tracing.traced("grid.paint_card")
+    def paint(self, painter, option, index):
+        poster_rect, title_rect, watchlist_rect, favorites_rect = self._rects(option.rect)
+        painter.save()
+
+        pixmap = index.data(Qt.DecorationRole)
+        if pixmap is not None and not pixmap.isNull():
+            # Posters arrive pre-scaled to the poster rect, so they are drawn as they are.
+            size = pixmap.size() / pixmap.devicePixelRatio()
+            x = poster_rect.x() + (poster_rect.width() - size.width()) // 2
+            y = poster_rect.y() + (poster_rect.height() - size.height()) // 2
+            painter.drawPixmap(x, y, pixmap)
+        else:
+            painter.fillRect(poster_rect, QColor("#d0d0d0"))
+
+        painter.setFont(self.title_font)
+        painter.setPen(QPen(QColor("blue")))
+        title = painter.fontMetrics().elidedText(index.data(Qt.DisplayRole), Qt.ElideRight, title_rect.width())
+        painter.drawText(title_rect, Qt.AlignCenter, title)
+        painter.restore()
+
+        in_watchlist = index.data(WatchlistRole)
+        in_favorites = index.data(FavoritesRole)
+        self._draw_button(painter, option, watchlist_rect,
+                          "Remove from Watchlist" if in_watchlist else "Add to Watchlist")
+        self._draw_button(painter, option, favorites_rect,
+                          "Remove from Favorites" if in_favorites else "Add to Favorites")
+
+    def _draw_button(self, painter, option, rect, text):
+        button = QStyleOptionButton()
+        button.rect = rect
+        button.text = text
+        button.state = QStyle.State_Enabled | QStyle.State_Raised
+        style = option.widget.style() if option.widget else QApplication.style()
+        style.drawControl(QStyle.CE_PushButton, button, painter, option.widget)
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() != QEvent.MouseButtonRelease or event.button() != Qt.LeftButton:
+            return False
+        poster_rect, title_rect, watchlist_rect, favorites_rect = self._rects(option.rect)
+        movie = index.data(MovieRole)
+        pos = event.pos()
+        if poster_rect.contains(pos) or title_rect.contains(pos):
+            self.details_requested.emit(movie)
+        elif watchlist_rect.contains(pos):
+            self.watchlist_clicked.emit(movie)
+        elif favorites_rect.contains(pos):
+            self.favorites_clicked.emit(movie)
+        else:
+            return False
+        return True
+
+
+class MovieGridView(QListView):
+    """Virtualized poster grid: only cards in the viewport are ever painted.
+
+    Resizing never rebuilds or refetches anything. The view debounces resize
+    events and re-runs its item layout once the column count has changed.
+    """
+
+    details_requested = pyqtSignal(object)
+    watchlist_clicked = pyqtSignal(object)
+    favorites_clicked = pyqtSignal(object)
+
+    def __init__(self, poster_loader, is_in_list, parent=None):
+        super().__init__(parent)
+        self.setViewMode(QListView.IconMode)
+        self.setMovement(QListView.Static)
+        self.setResizeMode(QListView.Fixed)
+        self.setUniformItemSizes(True)
+        self.setWrapping(True)
+        self.setGridSize(QSize(CARD_WIDTH + GAP_SIZE, CARD_HEIGHT + GAP_SIZE))
+        self.setSelectionMode(QListView.NoSelection)
+        self.setEditTriggers(QListView.NoEditTriggers)
+        self.setVerticalScrollMode(QListView.ScrollPerPixel)
+        self.verticalScrollBar().setSingleStep(GAP_SIZE * 2)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setFrameShape(QListView.NoFrame)
+
+        self._columns = 0
+        self._reflow_timer = QTimer(self)
+        self._reflow_timer.setSingleShot(True)
+        self._reflow_timer.setInterval(REFLOW_DELAY_MS)
+        self._reflow_timer.timeout.connect(self.reflow)
+
+        self.movie_model = MovieListModel(poster_loader, is_in_list, self)
+        self.setModel(self.movie_model)
+        delegate = MovieCardDelegate(self)
+        self.setItemDelegate(delegate)
+        delegate.details_requested.connect(self.details_requested)
+        delegate.watchlist_clicked.connect(self.watchlist_clicked)
+        delegate.favorites_clicked.connect(self.favorites_clicked)
+
+    def columns(self):
+        return max(1, self.viewport().width() // self.gridSize().width())
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._reflow_timer.start()
+
+    def reflow(self):
+        columns = self.columns()
+        if columns != self._columns:
+            self._columns = columns
+            self.doItemsLayout()
+
+    def set_movies(self, movies):
+        self.movie_model.set_movies(movies)
+        self.scrollToTop()
+
+    def clear(self):
+        self.movie_model.clear()
+
+    def append_movie(self, movie):
+        self.movie_model.append_movie(movie)
+
+    def update_movies(self, movies):
+        self.movie_model.update_movies(movies)
+
+    def append_movies(self, movies):
+        self.movie_model.insert_movies(len(self.movie_model.movies), movies)
+
+    def remove_movie(self, movie_id):
+        self.movie_model.remove_movie(movie_id)
+
+    def refresh(self):
+        self.movie_model.refresh()
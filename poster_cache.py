@@ -0,0 +1,144 @@
+import os
+import threading
+from collections import OrderedDict
+
+CACHE_DIR = os.getenv("POSTER_CACHE_DIR", "poster_cache")
+MEMORY_CACHE_BYTES = int(os.getenv("POSTER_MEMORY_CACHE_MB", 64)) * 1024 * 1024
+DISK_CACHE_BYTES = int(os.getenv("POSTER_DISK_CACHE_MB", 256)) * 1024 * 1024
+
+
+def _pixmap_cost(pixmap):
+    return pixmap.width() * pixmap.height() * max(1, pixmap.depth() // 8)
+
+
+class PosterCache:
+    """Two-tier poster cache.
+
+    The memory tier holds decoded QPixmaps, already scaled for display and
+    keyed by (poster_path, width, height); it is only touched from the GUI
+    thread. The disk tier stores the raw image bytes keyed by (poster_path,
+    TMDB size bucket) and may be read and written from worker threads. Both
+    tiers evict least recently used entries once their byte budget is
+    exceeded.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, memory_bytes=MEMORY_CACHE_BYTES, disk_bytes=DISK_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.memory_limit = memory_bytes
+        self.disk_limit = disk_bytes
+        self._memory = OrderedDict()
+        self._memory_size = 0
+        self._disk = OrderedDict()
+        self._disk_size = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            "memory_hits": 0,
+            "memory_misses": 0,
+            "memory_evictions": 0,
+            "disk_hits": 0,
+            "disk_misses": 0,
+            "disk_evictions": 0,
+        }
+        self._load_disk_index()
+
+    def _load_disk_index(self):
+        entries = []
+        if os.path.isdir(self.cache_dir):
+            for size in os.listdir(self.cache_dir):
+                bucket_dir = os.path.join(self.cache_dir, size)
+                if not os.path.isdir(bucket_dir):
+                    continue
+                for entry in os.scandir(bucket_dir):
+                    if entry.is_file() and not entry.name.endswith(".tmp"):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, entry.path, stat.st_size))
+        for _, path, size in sorted(entries):
+            self._disk[path] = size
+            self._disk_size += size
+        with self._lock:
+            self._evict_disk()
+
+    def _path(self, key):
+        poster_path, size = key
+        return os.path.join(self.cache_dir, size, os.path.basename(poster_path))
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def get_pixmap(self, key):
+        pixmap = self._memory.get(key)
+        if pixmap is None:
+            self._count("memory_misses")
+            return None
+        self._memory.move_to_end(key)
+        self._count("memory_hits")
+        return pixmap
+
+    def put_pixmap(self, key, pixmap):
+        cost = _pixmap_cost(pixmap)
+        if cost > self.memory_limit:
+            return
+        if key in self._memory:
+            self._memory_size -= _pixmap_cost(self._memory.pop(key))
+        self._memory[key] = pixmap
+        self._memory_size += cost
+        while self._memory_size > self.memory_limit and self._memory:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= _pixmap_cost(evicted)
+            self._count("memory_evictions")
+
+    def read_bytes(self, key):
+        path = self._path(key)
+        with self._lock:
+            if path not in self._disk:
+                self._stats["disk_misses"] += 1
+                return None
+            self._disk.move_to_end(path)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self._disk_size -= self._disk.pop(path, 0)
+                self._stats["disk_misses"] += 1
+            return None
+        self._count("disk_hits")
+        return data
+
+    def write_bytes(self, key, data):
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print("Error writing poster cache:", e)
+            return
+        with self._lock:
+            self._disk_size -= self._disk.pop(path, 0)
+            self._disk[path] = len(data)
+            self._disk_size += len(data)
+            self._evict_disk()
+
+    def _evict_disk(self):
+        while self._disk_size > self.disk_limit and self._disk:
+            path, size = self._disk.popitem(last=False)
+            self._disk_size -= size
+            self._stats["disk_evictions"] += 1
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["disk_bytes"] = self._disk_size
+            stats["disk_entries"] = len(self._disk)
+        stats["memory_bytes"] = self._memory_size
+        stats["memory_entries"] = len(self._memory)
+        return stats
@@ -0,0 +1,133 @@
+from PyQt5.QtCore import QObject, QSize, Qt, pyqtSignal
+from PyQt5.QtGui import QGuiApplication, QImage, QPixmap
+
+import tracing
+from scheduler import INTERACTIVE
+
+# TMDB poster sizes to download, as (width in pixels, size name), smallest first.
+POSTER_BUCKETS = ((92, "w92"), (200, "w200"), (500, "w500"))
+
+
+def poster_bucket(width, device_pixel_ratio=1.0):
+    """Return the smallest TMDB size that covers `width` logical pixels at this pixel ratio."""
+    pixels = width * device_pixel_ratio
+    for bucket_width, name in POSTER_BUCKETS:
+        if bucket_width >= pixels:
+            return name
+    return POSTER_BUCKETS[-1][1]
+
+
+class PosterLoader(QObject):
+    """Loads posters off the GUI thread and hands QPixmaps back on the GUI thread.
+
+    A request names the size the poster is displayed at. The TMDB size
+    bucket is picked from that size and the screen's pixel ratio, and the
+    worker decodes the image into a QImage already scaled to the display
+    size, so the GUI thread only converts it to a QPixmap and nothing is
+    rescaled at paint time.
+
+    Posters are looked up by (poster_path, width, height) in the memory tier
+    of the cache first, then by (poster_path, bucket) on disk, and only then
+    downloaded; concurrent requests for the same poster share a single job.
+    Jobs run on the request scheduler at the priority of their most urgent
+    request. Requests are tagged with a group (usually the grid they belong
+    to) so that clearing a grid can cancel everything still queued for it.
+    """
+
+    _finished = pyqtSignal(object, object)
+
+    def __init__(self, fetch, cache, scheduler, parent=None):
+        super().__init__(parent)
+        self.fetch = fetch
+        self.cache = cache
+        self.scheduler = scheduler
+        self._next_id = 0
+        self._pending = {}
+        self._jobs = {}
+        self._finished.connect(self._on_finished)
+
+    def cached(self, poster_path, width, height):
+        """Return the QPixmap for this poster at this display size if it is in memory."""
+        return self.cache.get_pixmap((poster_path, width, height))
+
+    def request(self, group, poster_path, width, height, callback, check_cache=True, priority=INTERACTIVE):
+        key = (poster_path, width, height)
+        tracing.count("poster.requests")
+        if check_cache:
+            pixmap = self.cache.get_pixmap(key)
+            if pixmap is not None:
+                tracing.count("poster.memory_hits")
+                callback(pixmap)
+                return None
+
+        self._next_id += 1
+        task_id = self._next_id
+        self._pending[task_id] = (group, key, callback)
+        if key in self._jobs:
+            tracing.count("poster.coalesced")
+            future, task_ids = self._jobs[key]
+            task_ids.add(task_id)
+            self.scheduler.promote(future, priority)
+        else:
+            device_pixel_ratio = QGuiApplication.instance().devicePixelRatio()
+            future = self.scheduler.submit(self._load, key, device_pixel_ratio, priority=priority)
+            self._jobs[key] = (future, {task_id})
+        return task_id
+
+    def cancel(self, group):
+        for task_id, (task_group, key, _) in list(self._pending.items()):
+            if task_group is not group:
+                continue
+            del self._pending[task_id]
+            future, task_ids = self._jobs.get(key, (None, set()))
+            task_ids.discard(task_id)
+            if future is not None and not task_ids:
+                future.cancel()
+                del self._jobs[key]
+
+    def shutdown(self):
+        for future, _ in self._jobs.values():
+            future.cancel()
+        self._jobs.clear()
+        self._pending.clear()
+
+    def _load(self, key, device_pixel_ratio):
+        poster_path, width, height = key
+        disk_key = (poster_path, poster_bucket(width, device_pixel_ratio))
+        with tracing.span("poster.disk_read"):
+            data = self.cache.read_bytes(disk_key)
+        if data is None:
+            tracing.count("poster.downloads")
+            try:
+                with tracing.span("poster.download"):
+                    data = self.fetch(*disk_key)
+            except Exception as e:
+                print("Error loading image:", e)
+            if data:
+                with tracing.span("poster.disk_write"):
+                    self.cache.write_bytes(disk_key, data)
+        else:
+            tracing.count("poster.disk_hits")
+
+        image = None
+        if data:
+            with tracing.span("poster.decode"):
+                image = QImage.fromData(data)
+                if image.isNull():
+                    image = None
+                else:
+                    size = QSize(round(width * device_pixel_ratio), round(height * device_pixel_ratio))
+                    image = image.scaled(size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+                    image.setDevicePixelRatio(device_pixel_ratio)
+        self._finished.emit(key, image)
+
+    def _on_finished(self, key, image):
+        _, task_ids = self._jobs.pop(key, (None, set()))
+        callbacks = [self._pending.pop(task_id)[2] for task_id in task_ids if task_id in self._pending]
+        pixmap = None
+        if image is not None:
+            # The decode is already paid for, so keep it even if every request was cancelled.
+            pixmap = QPixmap.fromImage(image)
+            self.cache.put_pixmap(key, pixmap)
+        for callback in callbacks:
+            callback(pixmap)
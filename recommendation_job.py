@@ -0,0 +1,107 @@
+import threading
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+# How long to wait for more favorite changes before recomputing.
+COALESCE_MS = 300
+
+
+class RecommendationJob(QObject):
+    """Recomputes recommendations in the background, one run at a time.
+
+    compute(is_cancelled, group, publish) runs on its own thread and returns
+    the list of movie dicts to show, or None if it gave up. It must poll
+    is_cancelled() between slow steps and tag the scheduler jobs it waits on
+    with `group`. It may call publish(movies), from any thread, to show
+    movies before it is done; `progress` then carries them to the GUI
+    thread, with replace=True on the first batch of a run. It does not run
+    on a scheduler worker, so it can block on scheduler futures without
+    taking a worker away from the jobs it waits for.
+
+    Triggers arriving within COALESCE_MS of each other start a single run.
+    A trigger while a run is in flight cancels it: its queued scheduler jobs
+    are dropped, its result is discarded, and a fresh run starts as soon as
+    it has returned. `finished` is emitted on the GUI thread with the result
+    of the newest run only.
+    """
+
+    finished = pyqtSignal(object)
+    progress = pyqtSignal(object, bool)
+    _done = pyqtSignal(int, object)
+    _published = pyqtSignal(int, object)
+
+    def __init__(self, compute, scheduler, parent=None):
+        super().__init__(parent)
+        self.compute = compute
+        self.scheduler = scheduler
+        self.generation = 0
+        self._group = None
+        self._running = False
+        self._pending = False
+        self._progress_generation = None
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._start)
+        self._done.connect(self._on_done)
+        self._published.connect(self._on_published)
+
+    @property
+    def busy(self):
+        return self._running or self._timer.isActive()
+
+    def trigger(self, delay=COALESCE_MS):
+        """Ask for a fresh result; any run already in flight is abandoned."""
+        self._cancel_current()
+        self._pending = True
+        self._timer.start(delay)
+
+    def cancel(self):
+        self._timer.stop()
+        self._pending = False
+        self._cancel_current()
+
+    def _cancel_current(self):
+        self.generation += 1
+        if self._group is not None:
+            self.scheduler.cancel_group(self._group)
+            self._group = None
+
+    def _start(self):
+        if self._running or not self._pending:
+            # Picked up again by _on_done once the abandoned run returns.
+            return
+        self._pending = False
+        self._running = True
+        self._group = object()
+        thread = threading.Thread(
+            target=self._run, args=(self.generation, self._group), name="recommendations", daemon=True
+        )
+        thread.start()
+
+    def _run(self, generation, group):
+        cancelled = lambda: generation != self.generation
+        publish = lambda movies: self._published.emit(generation, list(movies))
+        try:
+            result = self.compute(cancelled, group, publish)
+        except Exception as e:
+            if not cancelled():
+                print("Error computing recommendations:", e)
+            result = None
+        self._done.emit(generation, result)
+
+    def _on_published(self, generation, movies):
+        if generation != self.generation:
+            return
+        replace = self._progress_generation != generation
+        self._progress_generation = generation
+        self.progress.emit(movies, replace)
+
+    def _on_done(self, generation, result):
+        self._running = False
+        if generation != self.generation:
+            if not self._timer.isActive():
+                self._start()
+            return
+        self._group = None
+        if result is not None:
+            self.finished.emit(result)
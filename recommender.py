@@ -0,0 +1,119 @@
+import importlib.util
+import math
+import os
+import re
+import zlib
+
+import tracing
+
+# NumPy is imported by the first LocalRecommender, so the app starts without it.
+np = None
+
+# "gemini" asks the LLM for titles and resolves them on TMDB; "local" ranks stored movies with LocalRecommender.
+MODE = os.getenv("RECOMMENDATION_MODE", "gemini")
+# In "gemini" mode, stream the model's answer and show each title as soon as it resolves.
+STREAM = os.getenv("RECOMMENDATION_STREAM", "1") not in ("", "0")
+KEYWORD_DIMS = 512
+GENRE_WEIGHT = 1.0
+KEYWORD_WEIGHT = 0.8
+NUMERIC_WEIGHT = 0.3
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have he her his in into is it its of on or she that the their "
+    "them they this to was were when which who will with after before while where one two".split()
+)
+_TOKEN = re.compile(r"[a-z][a-z']+")
+
+
+def available():
+    return importlib.util.find_spec("numpy") is not None
+
+
+def _load_numpy():
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            raise RuntimeError("The local recommender needs NumPy")
+        np = numpy
+
+
+class LocalRecommender:
+    """Recommends movies from the local movies table, without a network round trip.
+
+    Every stored movie becomes a feature vector of its genres, hashed
+    overview keywords and popularity/vote figures. Candidates are ranked by
+    cosine similarity to the centroid of the favorites' vectors in a single
+    matrix product. The matrix is rebuilt only when the movies table changes.
+    """
+
+    def __init__(self, database):
+        _load_numpy()
+        self.database = database
+        self._version = None
+        self._ids = None
+        self._matrix = None
+
+    @tracing.traced("recommender.recommend")
+    def recommend(self, favorite_ids, k=20, exclude=()):
+        """Return up to k TMDB movie dicts most similar to the favorites, best first."""
+        self._refresh()
+        if not len(self._ids):
+            return []
+        rows = np.flatnonzero(np.isin(self._ids, list(favorite_ids)))
+        if not len(rows):
+            return []
+        centroid = self._matrix[rows].mean(axis=0)
+        norm = np.linalg.norm(centroid)
+        if norm == 0:
+            return []
+        scores = self._matrix @ (centroid / norm)
+        scores[np.isin(self._ids, list(set(favorite_ids) | set(exclude)))] = -np.inf
+        k = min(k, int(np.isfinite(scores).sum()))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        movies = self.database.get_movies(self._ids[top].tolist())
+        return [movies[movie_id] for movie_id in self._ids[top].tolist() if movie_id in movies]
+
+    def _refresh(self):
+        version = self.database.movies_version()
+        if version == self._version:
+            return
+        with tracing.span("recommender.build_matrix"):
+            rows = self.database.fetch_movie_features()
+            self._ids = np.array([row[0] for row in rows], dtype=np.int64)
+            self._matrix = self._features(rows)
+        self._version = version
+
+    def _features(self, rows):
+        genres = sorted({genre for row in rows for genre in row[1]})
+        genre_index = {genre: column for column, genre in enumerate(genres)}
+        genre_block = np.zeros((len(rows), len(genres)), dtype=np.float32)
+        keyword_block = np.zeros((len(rows), KEYWORD_DIMS), dtype=np.float32)
+        numeric_block = np.zeros((len(rows), 3), dtype=np.float32)
+
+        for i, (_, genre_ids, overview, popularity, vote_average, vote_count) in enumerate(rows):
+            for genre in genre_ids:
+                genre_block[i, genre_index[genre]] = 1.0
+            for token in _TOKEN.findall((overview or "").lower()):
+                if token not in STOPWORDS:
+                    keyword_block[i, zlib.crc32(token.encode()) % KEYWORD_DIMS] += 1.0
+            numeric_block[i] = (
+                math.log1p(popularity or 0), (vote_average or 0) / 10, math.log1p(vote_count or 0)
+            )
+
+        scale = numeric_block.max(axis=0)
+        numeric_block /= np.where(scale > 0, scale, 1)
+        blocks = [
+            _normalize(genre_block) * GENRE_WEIGHT,
+            _normalize(keyword_block) * KEYWORD_WEIGHT,
+            _normalize(numeric_block) * NUMERIC_WEIGHT,
+        ]
+        return _normalize(np.hstack(blocks))
+
+
+def _normalize(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms > 0, norms, 1)
@@ -0,0 +1,120 @@
+import json
+import sqlite3
+import threading
+import time
+
+CACHE_DB_PATH = "api_cache.db"
+# Expired responses are pruned again after this many writes.
+PRUNE_EVERY = 500
+
+
+class ResponseCache:
+    """SQLite-backed store of TMDB JSON responses with their validators."""
+
+    def __init__(self, db_path=CACHE_DB_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                body TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL
+            )
+        ''')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS resolved_titles (
+                title TEXT PRIMARY KEY,
+                movie TEXT
+            )
+        ''')
+        self.conn.commit()
+        self._windows = None
+        self._puts = 0
+
+    @staticmethod
+    def make_key(endpoint, params):
+        query = "&".join(f"{name}={params[name]}" for name in sorted(params) if name != "api_key")
+        return f"{endpoint}?{query}"
+
+    def get(self, key):
+        with self._lock:
+            row = self.conn.execute(
+                'SELECT body, etag, last_modified, fetched_at FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        body, etag, last_modified, fetched_at = row
+        return {
+            "data": json.loads(body),
+            "etag": etag,
+            "last_modified": last_modified,
+            "age": time.time() - fetched_at,
+        }
+
+    def put(self, key, data, etag=None, last_modified=None):
+        with self._lock:
+            self.conn.execute('''
+                INSERT OR REPLACE INTO responses (key, body, etag, last_modified, fetched_at)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (key, json.dumps(data), etag, last_modified, time.time()))
+            self.conn.commit()
+            self._puts += 1
+            due = self._windows is not None and self._puts % PRUNE_EVERY == 0
+        if due:
+            self.prune(self._windows)
+
+    def prune(self, windows):
+        """Delete responses past their stale window, and those of endpoints not in windows.
+
+        windows maps an endpoint to its (fresh, stale) seconds, as in
+        api_service.CACHE_TTLS. They are kept and applied again every
+        PRUNE_EVERY puts. Returns the number of rows deleted.
+        """
+        now = time.time()
+        prefixes = [f"{endpoint}?" for endpoint in windows]
+        with self._lock:
+            self._windows = dict(windows)
+            deleted = 0
+            for prefix, (ttl, stale_ttl) in zip(prefixes, windows.values()):
+                deleted += self.conn.execute(
+                    'DELETE FROM responses WHERE substr(key, 1, ?) = ? AND fetched_at < ?',
+                    (len(prefix), prefix, now - ttl - stale_ttl)
+                ).rowcount
+            known = " OR ".join("substr(key, 1, ?) = ?" for _ in prefixes) or "0"
+            deleted += self.conn.execute(
+                f'DELETE FROM responses WHERE NOT ({known})',
+                [value for prefix in prefixes for value in (len(prefix), prefix)]
+            ).rowcount
+            self.conn.commit()
+        return deleted
+
+    def touch(self, key):
+        with self._lock:
+            self.conn.execute('UPDATE responses SET fetched_at = ? WHERE key = ?', (time.time(), key))
+            self.conn.commit()
+
+    def get_resolved_titles(self, titles):
+        """Return {title: movie} for the titles that have been resolved before."""
+        titles = list(titles)
+        resolved = {}
+        with self._lock:
+            for start in range(0, len(titles), 500):
+                chunk = titles[start:start + 500]
+                placeholders = ", ".join("?" * len(chunk))
+                rows = self.conn.execute(
+                    f'SELECT title, movie FROM resolved_titles WHERE title IN ({placeholders})', chunk
+                ).fetchall()
+                for title, movie in rows:
+                    resolved[title] = json.loads(movie)
+        return resolved
+
+    def put_resolved_titles(self, resolved):
+        with self._lock:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO resolved_titles (title, movie) VALUES (?, ?)',
+                [(title, json.dumps(movie)) for title, movie in resolved.items()]
+            )
+            self.conn.commit()
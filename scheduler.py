@@ -0,0 +1,209 @@
+import heapq
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import Future
+from urllib.parse import urlsplit
+
+import tracing
+
+# Priority classes; lower runs first.
+INTERACTIVE = 0  # visible posters, the page on screen, user searches
+PREFETCH = 1     # the next page and its posters
+BACKGROUND = 2   # recommendation resolution, cache revalidation
+
+MAX_WORKERS = int(os.getenv("SCHEDULER_WORKERS", 8))
+# Workers that prefetch and background jobs may never occupy, so visible work always finds one free.
+RESERVED_WORKERS = int(os.getenv("SCHEDULER_RESERVED_WORKERS", 2))
+RATE_LIMIT = float(os.getenv("SCHEDULER_RATE_LIMIT", 40))
+BURST = int(os.getenv("SCHEDULER_BURST", 20))
+
+_local = threading.local()
+
+
+class _Job:
+    __slots__ = ("future", "fn", "args", "kwargs", "priority", "group")
+
+    def __init__(self, future, fn, args, kwargs, priority, group):
+        self.future = future
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.priority = priority
+        self.group = group
+
+
+class _Bucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.waiters = []
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self):
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+
+class RequestScheduler:
+    """Runs TMDB-bound jobs on a shared worker pool in priority order.
+
+    Jobs are queued with a priority class and an optional group; queued jobs
+    of a group can be dropped with cancel_group() once their page is gone.
+    Prefetch and background jobs never take the last RESERVED_WORKERS
+    workers. Network calls made from a job go through throttle(), which
+    enforces a token bucket per host and hands tokens to the most urgent
+    waiting job first.
+    """
+
+    def __init__(self, max_workers=MAX_WORKERS, reserved_workers=RESERVED_WORKERS,
+                 rate_limit=RATE_LIMIT, burst=BURST):
+        self.max_workers = max_workers
+        self.background_workers = max(1, max_workers - reserved_workers)
+        self.rate_limit = rate_limit
+        self.burst = burst
+        self._cond = threading.Condition()
+        self._queue = []
+        self._jobs = {}
+        self._buckets = {}
+        self._seq = itertools.count()
+        self._running_background = 0
+        self._shutdown = False
+        self._stats = {"submitted": 0, "completed": 0, "cancelled": 0, "throttled": 0}
+        self._threads = [
+            threading.Thread(target=self._work, name=f"scheduler-{i}", daemon=True)
+            for i in range(max_workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, fn, *args, priority=INTERACTIVE, group=None, **kwargs):
+        future = Future()
+        job = _Job(future, fn, args, kwargs, priority, group)
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("scheduler has been shut down")
+            self._jobs[future] = job
+            heapq.heappush(self._queue, (priority, next(self._seq), job))
+            self._stats["submitted"] += 1
+            # Throttled jobs wait on the same condition, so wake everyone.
+            self._cond.notify_all()
+        return future
+
+    def promote(self, future, priority):
+        """Move a queued job up to a more urgent priority class."""
+        with self._cond:
+            job = self._jobs.get(future)
+            if job is not None and priority < job.priority:
+                job.priority = priority
+                heapq.heappush(self._queue, (priority, next(self._seq), job))
+                self._cond.notify_all()
+
+    def cancel_group(self, group):
+        """Drop every queued job of `group`; jobs already running are left to finish."""
+        with self._cond:
+            for future, job in list(self._jobs.items()):
+                if job.group is group:
+                    del self._jobs[future]
+                    future.cancel()
+                    self._stats["cancelled"] += 1
+
+    def throttle(self, url):
+        """Block until the host of `url` has a request token for the calling job."""
+        host = urlsplit(url).netloc
+        priority = getattr(_local, "priority", INTERACTIVE)
+        with self._cond:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = _Bucket(self.rate_limit, self.burst)
+            waiter = (priority, next(self._seq))
+            heapq.heappush(bucket.waiters, waiter)
+            start = None
+            while True:
+                bucket.refill()
+                if bucket.waiters[0] == waiter and bucket.tokens >= 1:
+                    heapq.heappop(bucket.waiters)
+                    bucket.tokens -= 1
+                    self._cond.notify_all()
+                    break
+                if start is None:
+                    start = time.perf_counter_ns()
+                    self._stats["throttled"] += 1
+                self._cond.wait(bucket.wait_time() if bucket.waiters[0] == waiter else None)
+        if start is not None and tracing.tracer is not None:
+            tracing.tracer.add_span("scheduler.throttle", start, time.perf_counter_ns(), {"host": host})
+
+    def stats(self):
+        with self._cond:
+            return dict(self._stats, queued=len(self._jobs))
+
+    def shutdown(self):
+        with self._cond:
+            self._shutdown = True
+            for future in self._jobs:
+                future.cancel()
+            self._jobs.clear()
+            self._queue.clear()
+            self._cond.notify_all()
+
+    def _next_job(self):
+        """Pop the most urgent runnable job, or return None; call with the lock held."""
+        while self._queue:
+            priority, _, job = self._queue[0]
+            if self._jobs.get(job.future) is not job or priority != job.priority:
+                heapq.heappop(self._queue)
+                continue
+            if priority != INTERACTIVE and self._running_background >= self.background_workers:
+                return None
+            heapq.heappop(self._queue)
+            del self._jobs[job.future]
+            return job
+        return None
+
+    def _work(self):
+        while True:
+            with self._cond:
+                job = self._next_job()
+                while job is None:
+                    if self._shutdown:
+                        return
+                    self._cond.wait()
+                    job = self._next_job()
+                background = job.priority != INTERACTIVE
+                if background:
+                    self._running_background += 1
+            ran = False
+            try:
+                if job.future.set_running_or_notify_cancel():
+                    ran = True
+                    _local.priority = job.priority
+                    try:
+                        job.future.set_result(job.fn(*job.args, **job.kwargs))
+                    except BaseException as e:
+                        job.future.set_exception(e)
+            finally:
+                _local.priority = INTERACTIVE
+                with self._cond:
+                    if background:
+                        self._running_background -= 1
+                    self._stats["completed" if ran else "cancelled"] += 1
+                    self._cond.notify_all()
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """Return the scheduler shared by the whole app."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = RequestScheduler()
+        return _scheduler
@@ -0,0 +1,35 @@
+import json
+import os
+
+SNAPSHOT_PATH = os.getenv("MOVIE_APP_SNAPSHOT", "session_snapshot.json")
+SNAPSHOT_VERSION = 1
+# Posters listed in the snapshot to warm up before the first page is built.
+MAX_THUMBNAILS = 60
+
+
+def load(path=SNAPSHOT_PATH):
+    """Return the snapshot saved by the last session, or {} if there is none or it is unreadable.
+
+    The snapshot holds what the window showed on exit so the next start can
+    paint it before anything has been fetched:
+    {"page": name, "trending": {"page", "movies"}, "search": {"query", "movies"},
+     "recommendations": {"mode", "favorites", "movies"}, "thumbnails": [poster_path, ...]}
+    """
+    try:
+        with open(path) as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(snapshot, dict) or snapshot.get("version") != SNAPSHOT_VERSION:
+        return {}
+    return snapshot
+
+
+def save(snapshot, path=SNAPSHOT_PATH):
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump(dict(snapshot, version=SNAPSHOT_VERSION), f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    except (OSError, TypeError, ValueError) as e:
+        print("Error saving session snapshot:", e)
@@ -0,0 +1,173 @@
+import json
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from functools import wraps
+
+# MOVIE_APP_TRACE=<file> turns tracing on and names the Chrome trace written
+# on exit; MOVIE_APP_TRACE_OVERLAY=1 also shows live numbers in the window.
+TRACE_FILE = os.getenv("MOVIE_APP_TRACE")
+ENABLED = bool(TRACE_FILE)
+OVERLAY = ENABLED and os.getenv("MOVIE_APP_TRACE_OVERLAY", "") not in ("", "0")
+OVERLAY_REFRESH_MS = 1000
+MAX_EVENTS = int(os.getenv("MOVIE_APP_TRACE_MAX_EVENTS", 500000))
+
+
+class Tracer:
+    """Collects timed spans and counters and writes them as a Chrome trace.
+
+    Open the exported file in chrome://tracing or https://ui.perfetto.dev.
+    """
+
+    def __init__(self, max_events=MAX_EVENTS):
+        self.max_events = max_events
+        self.start_ns = time.perf_counter_ns()
+        self.events = []
+        self.dropped = 0
+        self.counters = Counter()
+        self.totals = defaultdict(lambda: [0, 0])
+        self.threads = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name, **args):
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.add_span(name, start, time.perf_counter_ns(), args)
+
+    def add_span(self, name, start_ns, end_ns, args=None):
+        thread = threading.current_thread()
+        event = {
+            "name": name,
+            "cat": name.split(".", 1)[0],
+            "ph": "X",
+            "ts": (start_ns - self.start_ns) / 1000,
+            "dur": (end_ns - start_ns) / 1000,
+            "pid": os.getpid(),
+            "tid": thread.ident,
+        }
+        if args:
+            event["args"] = args
+        with self._lock:
+            self.threads.setdefault(thread.ident, thread.name)
+            total = self.totals[name]
+            total[0] += 1
+            total[1] += end_ns - start_ns
+            if len(self.events) < self.max_events:
+                self.events.append(event)
+            else:
+                self.dropped += 1
+
+    def count(self, name, value=1):
+        with self._lock:
+            self.counters[name] += value
+
+    def summary(self):
+        """Return {"spans": {name: {count, total_ms}}, "counters": {...}}."""
+        with self._lock:
+            return {
+                "spans": {
+                    name: {"count": count, "total_ms": round(total_ns / 1e6, 3)}
+                    for name, (count, total_ns) in self.totals.items()
+                },
+                "counters": dict(self.counters),
+            }
+
+    def export(self, path):
+        with self._lock:
+            pid = os.getpid()
+            now = (time.perf_counter_ns() - self.start_ns) / 1000
+            events = [
+                {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+                for tid, name in self.threads.items()
+            ]
+            events += self.events
+            events += [
+                {"name": name, "ph": "C", "ts": now, "pid": pid, "tid": 0, "args": {"value": value}}
+                for name, value in self.counters.items()
+            ]
+            dropped = self.dropped
+        with open(path, "w") as f:
+            json.dump({
+                "traceEvents": events,
+                "displayTimeUnit": "ms",
+                "otherData": dict(self.summary(), dropped_events=dropped),
+            }, f)
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+tracer = Tracer() if ENABLED else None
+
+
+def span(name, **args):
+    """Time the enclosed block; returns a shared no-op context when tracing is off."""
+    if tracer is None:
+        return _NULL_SPAN
+    return tracer.span(name, **args)
+
+
+def count(name, value=1):
+    if tracer is not None:
+        tracer.count(name, value)
+
+
+def traced(name):
+    """Decorator form of span(); when tracing is off the function is returned unchanged."""
+    def decorate(func):
+        if tracer is None:
+            return func
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with tracer.span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def export(path=None):
+    path = path or TRACE_FILE
+    if tracer is not None and path:
+        tracer.export(path)
+        print("Trace written to", path)
+
+
+def install_overlay(widget):
+    """Show span totals and counters over `widget`, refreshed every second."""
+    if tracer is None:
+        return None
+    from PyQt5.QtCore import Qt, QTimer
+    from PyQt5.QtWidgets import QLabel
+
+    label = QLabel(widget)
+    label.setAttribute(Qt.WA_TransparentForMouseEvents)
+    label.setStyleSheet("background: rgba(0, 0, 0, 170); color: #e0e0e0; font-family: monospace; padding: 6px;")
+
+    def refresh():
+        summary = tracer.summary()
+        spans = sorted(summary["spans"].items(), key=lambda item: item[1]["total_ms"], reverse=True)
+        lines = [f"{name:<28} {stats['count']:>7} {stats['total_ms']:>10.1f} ms" for name, stats in spans[:12]]
+        lines += [f"{name:<28} {value:>7}" for name, value in sorted(summary["counters"].items())]
+        label.setText("\n".join(lines) or "No trace data yet")
+        label.adjustSize()
+        label.move(widget.width() - label.width() - 10, widget.height() - label.height() - 10)
+        label.raise_()
+
+    timer = QTimer(label)
+    timer.timeout.connect(refresh)
+    timer.start(OVERLAY_REFRESH_MS)
+    refresh()
+    label.show()
+    return label